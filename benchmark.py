@@ -0,0 +1,175 @@
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from visualizador import MODALITY_PARAMS, TEAMS, GameMode, Pose2D, SoccerVisualizer
+
+ROBOT_COUNTS = (6, 22, 100)
+PATH_LENGTHS = (10, 100, 1000, 10000)
+MODES = (GameMode.SSL, GameMode.VSSS)
+
+
+def build_scenario(visualizer, mode, robots, path_length, seed):
+    """Coloca `robots` robôs e caminhos de `path_length` pontos, de forma reproduzível"""
+    rng = random.Random(seed)
+    visualizer.update_game_mode(mode)
+    visualizer.world.clear()
+    visualizer.robot_paths.clear()
+
+    bounds = MODALITY_PARAMS[mode]["field_bounds"]
+    step = (bounds["x_max"] - bounds["x_min"]) / 50
+    for i in range(robots):
+        x = rng.uniform(bounds["x_min"], bounds["x_max"])
+        y = rng.uniform(bounds["y_min"], bounds["y_max"])
+        visualizer.world.set_robot(i // 2, x, y, rng.uniform(0, 2*math.pi), TEAMS[i % 2])
+
+        path = [Pose2D(x, y, 0)]
+        for _ in range(path_length - 1):
+            x = min(max(x + rng.uniform(-step, step), bounds["x_min"]), bounds["x_max"])
+            y = min(max(y + rng.uniform(-step, step), bounds["y_min"]), bounds["y_max"])
+            path.append(Pose2D(x, y, 0))
+        # Os caminhos são indexados só pelo id; os dois times compartilham
+        visualizer.robot_paths[i // 2] = path
+
+    visualizer.world.set_ball(rng.uniform(bounds["x_min"], bounds["x_max"]),
+                              rng.uniform(bounds["y_min"], bounds["y_max"]))
+
+
+def move_world(world, frame):
+    """Movimento determinístico entre frames, para exercitar os caches"""
+    n = world.count
+    world.orientation[:n] = (world.orientation[:n] + 0.03) % (2*math.pi)
+    world.xy[:n] += math.sin(frame / 7) * 5
+    world.ball_xy += (3, -2)
+
+
+def measure_fps(visualizer, draw, min_frames, budget):
+    """Frames por segundo de `draw` movendo o mundo a cada frame"""
+    frames = 0
+    started = time.perf_counter()
+    while frames < min_frames or time.perf_counter() - started < budget:
+        move_world(visualizer.world, frames)
+        draw()
+        frames += 1
+    return frames / (time.perf_counter() - started)
+
+
+def measure_call(function, calls):
+    """Custo médio de uma chamada em microssegundos"""
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run_scenario(visualizer, mode, robots, path_length, seed, budget):
+    build_scenario(visualizer, mode, robots, path_length, seed)
+    visualizer.calculate_scale_factor()
+    min_frames = 3 if robots * path_length > 100000 else 30
+
+    result = {
+        'mode': mode.name,
+        'robots': robots,
+        'path_length': path_length,
+        'fps_full': measure_fps(visualizer, visualizer.draw_frame, min_frames, budget),
+        'fps_dirty': measure_fps(visualizer, visualizer.draw_frame_dirty, min_frames, budget),
+    }
+
+    robot = visualizer.robots[0]
+    ball = visualizer.ball
+    result['us_per_call'] = {
+        'mm_to_px': measure_call(lambda: visualizer.mm_to_px(ball.x, ball.y), 20000),
+        'draw_field': measure_call(visualizer.draw_field, 200),
+        'draw_robot': measure_call(lambda: visualizer.draw_robot(robot), 2000),
+        'draw_info_panel': measure_call(visualizer.draw_info_panel, 200),
+    }
+    return result
+
+
+def scenario_key(result):
+    return (result['mode'], result['robots'], result['path_length'])
+
+
+def compare(results, baseline, tolerance):
+    """Lista as métricas que pioraram mais que `tolerance` em relação ao baseline"""
+    previous = {scenario_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get(scenario_key(result))
+        if old is None:
+            continue
+        for metric in ('fps_full', 'fps_dirty'):
+            if result[metric] < old[metric] * (1 - tolerance):
+                regressions.append((scenario_key(result), metric, old[metric], result[metric]))
+        for call, cost in result['us_per_call'].items():
+            old_cost = old['us_per_call'].get(call)
+            if old_cost is not None and cost > old_cost * (1 + tolerance):
+                regressions.append((scenario_key(result), call, old_cost, cost))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de renderização sem janela")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="segundos mínimos de medição de FPS por cenário")
+    parser.add_argument("--robots", type=int, nargs="+", default=ROBOT_COUNTS)
+    parser.add_argument("--path-lengths", type=int, nargs="+", default=PATH_LENGTHS)
+    parser.add_argument("--modes", nargs="+", choices=[mode.name for mode in MODES],
+                        default=[mode.name for mode in MODES])
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="resultado anterior; sai com código 1 se houver regressão")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    # Partida a frio: criação do visualizador até o primeiro frame desenhado
+    started = time.perf_counter()
+    visualizer = SoccerVisualizer(headless=True)
+    visualizer.draw_frame_dirty()
+    cold_start_ms = (time.perf_counter() - started) * 1000
+    print(f"partida a frio: {cold_start_ms:.1f} ms")
+
+    results = []
+    for mode_name in args.modes:
+        for robots in args.robots:
+            for path_length in args.path_lengths:
+                result = run_scenario(visualizer, GameMode[mode_name], robots,
+                                      path_length, args.seed, args.budget)
+                results.append(result)
+                print(f"{mode_name:4} robôs={robots:3} caminho={path_length:5} "
+                      f"fps={result['fps_full']:8.1f} fps_incremental={result['fps_dirty']:8.1f}")
+    pygame.quit()
+
+    report = {
+        'seed': args.seed,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cold_start_ms': cold_start_ms,
+        'results': results,
+    }
+    with open(args.output, 'w') as out:
+        json.dump(report, out, indent=2)
+    print(f"Resultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for key, metric, old, new in regressions:
+            print(f"REGRESSÃO {key} {metric}: {old:.2f} -> {new:.2f}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import numpy as np
+
+# Fator entre níveis de zoom consecutivos (4 níveis por dobra)
+ZOOM_STEP = 2 ** 0.25
+MAX_ZOOM_LEVEL = 10  # ~5.7x
+
+
+class Camera:
+    """Zoom e centro da vista sobre o campo
+
+    O zoom é discreto (potências de ZOOM_STEP sobre a escala que mostra o
+    campo inteiro), então cada nível tem uma escala fixa e as camadas e
+    sprites daquela escala podem ser reaproveitados do cache. O centro fica
+    em mm, relativo ao centro do campo, e não sai dos limites do campo.
+    """
+
+    def __init__(self, max_level=MAX_ZOOM_LEVEL):
+        self.max_level = max_level
+        self.level = 0
+        self.center = np.zeros(2)
+
+    @property
+    def zoom(self):
+        return ZOOM_STEP ** self.level
+
+    def reset(self):
+        self.level = 0
+        self.center = np.zeros(2)
+
+    def zoom_at(self, steps, anchor_mm, bounds):
+        """Muda `steps` níveis de zoom mantendo `anchor_mm` no mesmo pixel da tela"""
+        level = min(max(self.level + steps, 0), self.max_level)
+        if level == self.level:
+            return False
+        ratio = self.zoom / ZOOM_STEP ** level
+        self.level = level
+        anchor = np.asarray(anchor_mm, dtype=float)
+        self.center = anchor - (anchor - self.center) * ratio
+        self.clamp(bounds)
+        return True
+
+    def pan(self, dx_mm, dy_mm, bounds):
+        self.center = self.center + (dx_mm, dy_mm)
+        self.clamp(bounds)
+
+    def clamp(self, bounds):
+        if self.level == 0:
+            # Sem zoom o campo inteiro aparece na posição padrão
+            self.center = np.zeros(2)
+        else:
+            self.center = np.clip(self.center, (bounds["x_min"], bounds["y_min"]),
+                                  (bounds["x_max"], bounds["y_max"]))
@@ -0,0 +1,126 @@
+import math
+
+import numpy as np
+
+# Até quantos pontos `pairs_within` compara todos os pares direto
+ALL_PAIRS_LIMIT = 64
+
+
+class SpatialGrid:
+    """Grade uniforme sobre o campo para consultas de vizinhança entre robôs
+
+    Os pontos são ordenados pela chave da célula; cada linha de células de
+    uma consulta vira um intervalo contíguo encontrado com `searchsorted`.
+    Pontos fora do campo ficam nas células da borda, então as consultas
+    continuam exatas (a distância real é sempre verificada no final).
+    """
+
+    def __init__(self, bounds, cell_size):
+        self.x_min = bounds["x_min"]
+        self.y_min = bounds["y_min"]
+        self.cell_size = cell_size
+        self.nx = int(math.ceil((bounds["x_max"] - bounds["x_min"]) / cell_size)) + 1
+        self.ny = int(math.ceil((bounds["y_max"] - bounds["y_min"]) / cell_size)) + 1
+        self.max_distance = math.hypot(self.nx, self.ny) * cell_size
+
+        self.xy = np.zeros((0, 2))
+        self._order = np.zeros(0, dtype=np.intp)
+        self._keys = np.zeros(0, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.xy)
+
+    def _cell(self, x, y):
+        ix = np.clip(np.floor((x - self.x_min) / self.cell_size), 0, self.nx - 1)
+        iy = np.clip(np.floor((y - self.y_min) / self.cell_size), 0, self.ny - 1)
+        return ix.astype(np.intp), iy.astype(np.intp)
+
+    def rebuild(self, xy):
+        """Reindexa as posições (N,2) em mm; os índices das consultas referem-se a elas"""
+        self.xy = np.array(xy, dtype=float).reshape(-1, 2)
+        ix, iy = self._cell(self.xy[:, 0], self.xy[:, 1])
+        keys = ix * self.ny + iy
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+
+    def query_radius(self, x, y, radius):
+        """Índices e distâncias dos pontos a até `radius` mm de (x, y)"""
+        if not len(self.xy):
+            return np.zeros(0, dtype=np.intp), np.zeros(0)
+        ix0, iy0 = self._cell(np.float64(x - radius), np.float64(y - radius))
+        ix1, iy1 = self._cell(np.float64(x + radius), np.float64(y + radius))
+
+        rows = np.arange(ix0, ix1 + 1) * self.ny
+        lo = np.searchsorted(self._keys, rows + iy0, side='left')
+        hi = np.searchsorted(self._keys, rows + iy1, side='right')
+        candidates = np.concatenate([self._order[a:b] for a, b in zip(lo.tolist(), hi.tolist())])
+
+        dist = np.hypot(self.xy[candidates, 0] - x, self.xy[candidates, 1] - y)
+        inside = dist <= radius
+        return candidates[inside], dist[inside]
+
+    def nearest(self, x, y):
+        """(índice, distância) do ponto mais próximo de (x, y), ou None se vazio
+
+        A busca dobra o raio até achar algum ponto; o menor dentro do raio é
+        o mais próximo de todos, pois todos os pontos do raio são examinados.
+        """
+        radius = self.cell_size
+        while len(self.xy):
+            indices, dist = self.query_radius(x, y, radius)
+            if len(indices):
+                i = int(np.argmin(dist))
+                return int(indices[i]), float(dist[i])
+            if radius > self.max_distance:
+                # Ponto de consulta muito fora do campo: busca exaustiva
+                dist = np.hypot(self.xy[:, 0] - x, self.xy[:, 1] - y)
+                i = int(np.argmin(dist))
+                return i, float(dist[i])
+            radius *= 2
+        return None
+
+    def pairs_within(self, distance):
+        """Pares (K,2) de índices (i, j), i < j, de pontos a até `distance` mm um do outro
+
+        Com poucos pontos compara todos os pares de uma vez; acima de
+        ALL_PAIRS_LIMIT busca, para todos os pontos juntos, os intervalos das
+        linhas de células vizinhas e expande os candidatos sem laço em Python.
+        """
+        n = len(self.xy)
+        if n <= ALL_PAIRS_LIMIT:
+            i, j = np.triu_indices(n, k=1)
+        else:
+            i, j = self._neighbour_candidates(distance)
+        dist = np.hypot(self.xy[i, 0] - self.xy[j, 0], self.xy[i, 1] - self.xy[j, 1])
+        inside = dist <= distance
+        return np.stack((i[inside], j[inside]), axis=1)
+
+    def _neighbour_candidates(self, distance):
+        """Pares (i, j), i < j, de pontos em células a até `distance` mm de distância"""
+        ix, iy = self._cell(self.xy[:, 0], self.xy[:, 1])
+        reach = int(math.ceil(distance / self.cell_size))
+        iy0 = np.maximum(iy - reach, 0)
+        iy1 = np.minimum(iy + reach, self.ny - 1)
+        points = np.arange(len(self.xy))
+
+        first, second = [], []
+        for dx in range(-reach, reach + 1):
+            rows = (ix + dx) * self.ny
+            lo = np.searchsorted(self._keys, rows + iy0, side='left')
+            hi = np.searchsorted(self._keys, rows + iy1, side='right')
+            outside = (ix + dx < 0) | (ix + dx >= self.nx)
+            hi[outside] = lo[outside]  # linha fora da grade: intervalo vazio
+            counts = hi - lo
+            total = int(counts.sum())
+            if not total:
+                continue
+            # Posição de cada candidato em `_order`: início do intervalo + deslocamento nele
+            starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            candidates = self._order[starts + np.arange(total)]
+            owners = np.repeat(points, counts)
+            keep = candidates > owners
+            first.append(owners[keep])
+            second.append(candidates[keep])
+        if not first:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        return np.concatenate(first), np.concatenate(second)
@@ -0,0 +1,102 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from gravacao import LogReplay
+from visualizador import GameMode, SoccerVisualizer
+
+# Formatos de saída: fluxo RGB cru (ex.: para o ffmpeg) ou sequência de imagens
+FORMAT_RAW = 'raw'
+FORMAT_IMAGES = 'images'
+
+
+def frame_indices(replay, fps, first_frame, last_frame):
+    """Registro do log mostrado em cada frame [first_frame, last_frame)"""
+    return [replay.index_at(replay.start_time + frame / fps)
+            for frame in range(first_frame, last_frame)]
+
+
+def frame_count(replay, fps):
+    # Arredonda antes de truncar: 199 * (1/30) * 30 dá 198.99999... em ponto flutuante
+    return int(round((replay.end_time - replay.start_time) * fps)) + 1 if len(replay) else 0
+
+
+def render_chunk(log_path, output, output_format, game_mode, fps, first_frame, last_frame):
+    """Renderiza os frames [first_frame, last_frame) de um log sem janela
+
+    Roda num processo próprio. No formato raw cada pedaço é gravado em
+    `output.<first_frame>` e depois concatenado na ordem; no formato images o
+    nome de cada arquivo vem de `output % frame`.
+    """
+    visualizer = SoccerVisualizer(headless=True)
+    visualizer.update_game_mode(game_mode)
+    replay = LogReplay(log_path)
+    visualizer.attach_replay(replay)
+
+    raw_file = None
+    if output_format == FORMAT_RAW:
+        raw_file = open(f"{output}.{first_frame:08d}", 'wb')
+
+    try:
+        for frame, index in zip(range(first_frame, last_frame),
+                                frame_indices(replay, fps, first_frame, last_frame)):
+            replay.load(visualizer.world, index)
+            visualizer.draw_frame()
+            if raw_file is not None:
+                raw_file.write(pygame.image.tobytes(visualizer.screen, 'RGB'))
+            else:
+                pygame.image.save(visualizer.screen, output % frame)
+    finally:
+        if raw_file is not None:
+            raw_file.close()
+        pygame.quit()
+    return last_frame - first_frame
+
+
+def export_replay(log_path, output, output_format=FORMAT_RAW, game_mode=GameMode.SSL,
+                  fps=60.0, workers=None, chunk_size=600):
+    """Exporta um log como vídeo cru ou imagens, dividindo a linha do tempo entre processos
+
+    Retorna o número de frames gravados.
+    """
+    total = frame_count(LogReplay(log_path), fps)
+    chunks = [(first, min(first + chunk_size, total))
+              for first in range(0, total, chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_chunk, log_path, output, output_format,
+                               game_mode, fps, first, last)
+                   for first, last in chunks]
+        rendered = sum(future.result() for future in futures)
+
+    if output_format == FORMAT_RAW:
+        with open(output, 'wb') as out:
+            for first, _ in chunks:
+                part = f"{output}.{first:08d}"
+                with open(part, 'rb') as part_file:
+                    while True:
+                        block = part_file.read(1 << 20)
+                        if not block:
+                            break
+                        out.write(block)
+                os.remove(part)
+    return rendered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Exporta um log gravado como frames, sem janela")
+    parser.add_argument("log", help="log gravado com visualizador.py --record")
+    parser.add_argument("output",
+                        help="arquivo RGB cru ou padrão de imagens (ex.: frames/%%06d.png)")
+    parser.add_argument("--format", choices=[FORMAT_RAW, FORMAT_IMAGES], default=FORMAT_RAW)
+    parser.add_argument("--mode", choices=[mode.name for mode in GameMode], default="SSL")
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    frames = export_replay(args.log, args.output, args.format, GameMode[args.mode],
+                           args.fps, args.workers)
+    print(f"{frames} frames exportados para {args.output}")
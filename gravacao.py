@@ -0,0 +1,185 @@
+import os
+import time
+import warnings
+
+import numpy as np
+
+from visualizador import TEAMS
+
+# Cabeçalho do arquivo: magic (8 bytes) + max_robots (u4) + reservado (u4)
+LOG_MAGIC = b'VSLOG001'
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('max_robots', '<u4'), ('reserved', '<u4')])
+
+ROBOT_DTYPE = np.dtype([
+    ('id', '<u2'),
+    ('team', 'u1'),  # índice em TEAMS
+    ('pad', 'u1'),
+    ('x', '<f4'),  # mm
+    ('y', '<f4'),  # mm
+    ('orientation', '<f4'),  # radianos
+])
+
+# Intervalo máximo (s) entre descargas do arquivo durante a gravação
+FLUSH_INTERVAL = 1.0
+
+# Velocidades de reprodução permitidas
+MIN_SPEED = 0.25
+MAX_SPEED = 16.0
+
+
+def record_dtype(max_robots):
+    """Registro de tamanho fixo: instante, bola e até `max_robots` robôs"""
+    return np.dtype([
+        ('timestamp', '<f8'),  # segundos
+        ('ball', '<f4', (2,)),  # mm
+        ('count', '<u2'),
+        ('pad', 'u1', (6,)),
+        ('robots', ROBOT_DTYPE, (max_robots,)),
+    ])
+
+
+class LogRecorder:
+    """Grava cada snapshot do WorldState como um registro binário de tamanho fixo
+
+    O arquivo é descarregado a cada `flush_interval` segundos, então um
+    processo interrompido perde no máximo esse intervalo de gravação. Robôs
+    além de `max_robots` não cabem no registro: são contados em `truncated`
+    (robôs descartados) e geram um aviso na primeira vez.
+    """
+
+    def __init__(self, path, max_robots=32, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.max_robots = max_robots
+        self.flush_interval = flush_interval
+        self.records = 0
+        self.truncated = 0
+        self._last_flush = time.monotonic()
+        self._record = np.zeros(1, dtype=record_dtype(max_robots))
+        self._file = open(path, 'wb')
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = LOG_MAGIC
+        header['max_robots'] = max_robots
+        self._file.write(header.tobytes())
+
+    def record(self, world, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        n = min(world.count, self.max_robots)
+        if world.count > n:
+            if not self.truncated:
+                warnings.warn(f"{world.count} robôs em campo, o log {self.path} guarda só "
+                              f"{self.max_robots} por registro", RuntimeWarning, stacklevel=2)
+            self.truncated += world.count - n
+
+        record = self._record[0]
+        record['timestamp'] = timestamp
+        record['ball'] = world.ball_xy
+        record['count'] = n
+        robots = record['robots']
+        robots['id'][:n] = world.ids[:n]
+        robots['team'][:n] = world.team[:n]
+        robots['x'][:n] = world.x[:n]
+        robots['y'][:n] = world.y[:n]
+        robots['orientation'][:n] = world.orientation[:n]
+
+        self._file.write(self._record.tobytes())
+        self.records += 1
+
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self):
+        self._file.close()
+
+
+class LogReplay:
+    """Reprodução de um log via memmap, com busca por instante e velocidade variável
+
+    O arquivo não é carregado na memória: a coluna de instantes é uma visão
+    do memmap e `seek` faz busca binária nela (O(log n) páginas lidas). Um
+    registro final incompleto (gravação interrompida) é ignorado.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header['magic'][0] != LOG_MAGIC:
+            raise ValueError(f"{path} não é um log do visualizador")
+        self.max_robots = int(header['max_robots'][0])
+
+        dtype = record_dtype(self.max_robots)
+        n = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // dtype.itemsize
+        if n <= 0:
+            self.records = np.zeros(0, dtype=dtype)  # log vazio (memmap não aceita)
+        else:
+            self.records = np.memmap(path, dtype=dtype, mode='r',
+                                     offset=HEADER_DTYPE.itemsize, shape=(n,))
+        self.timestamps = self.records['timestamp']
+
+        self.index = 0
+        self.speed = 1.0
+        self.paused = False
+        self.position = self.start_time  # instante atual no log
+        self._loaded = None
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def start_time(self):
+        return float(self.timestamps[0]) if len(self) else 0.0
+
+    @property
+    def end_time(self):
+        return float(self.timestamps[-1]) if len(self) else 0.0
+
+    def index_at(self, timestamp):
+        """Último registro com instante <= timestamp"""
+        index = int(np.searchsorted(self.timestamps, timestamp, side='right')) - 1
+        return min(max(index, 0), len(self) - 1)
+
+    def seek(self, timestamp):
+        self.position = min(max(timestamp, self.start_time), self.end_time)
+        self.index = self.index_at(self.position)
+
+    def set_speed(self, speed):
+        self.speed = min(max(speed, MIN_SPEED), MAX_SPEED)
+
+    def step(self, frames=1):
+        """Avança (ou recua) registros inteiros; usado com a reprodução pausada"""
+        if not len(self):
+            return
+        self.index = min(max(self.index + frames, 0), len(self) - 1)
+        self.position = float(self.timestamps[self.index])
+
+    def advance(self, dt):
+        """Avança o relógio de reprodução em `dt` segundos de tempo real"""
+        if not self.paused and len(self):
+            self.seek(self.position + dt * self.speed)
+
+    def load(self, world, index=None):
+        """Escreve o registro `index` (ou o atual) no WorldState; retorna se mudou"""
+        if index is None:
+            index = self.index
+        if index == self._loaded or not len(self):
+            return False
+        self._loaded = index
+
+        record = self.records[index]
+        n = int(record['count'])
+        robots = record['robots'][:n]
+        world.update_robots(zip(robots['id'].tolist(),
+                                robots['x'].tolist(),
+                                robots['y'].tolist(),
+                                robots['orientation'].tolist(),
+                                (TEAMS[team] for team in robots['team'].tolist())))
+        world.set_ball(*record['ball'].tolist())
+        return True
+
+    def update(self, world, dt):
+        """Avança o relógio e carrega o registro correspondente"""
+        self.advance(dt)
+        return self.load(world)
@@ -0,0 +1,133 @@
+import math
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from visualizador import MAX_ROBOT_ID, TEAMS
+
+# Pacote de estado do mundo recebido de uma fonte de visão
+# robots: [(id, x_mm, y_mm, orientation_rad, team), ...]
+# ball: (x_mm, y_mm) ou None se a bola não foi vista
+WorldPacket = namedtuple('WorldPacket', ['timestamp', 'robots', 'ball'])
+
+# Snapshot publicado para o loop de renderização
+Snapshot = namedtuple('Snapshot', ['seq', 'packet'])
+
+
+def valid_packet(packet):
+    """Se o pacote pode ser aplicado ao WorldState sem erro (tipos, times e ids)"""
+    try:
+        if math.isnan(float(packet.timestamp)):
+            return False
+        for robot_id, x, y, orientation, team in packet.robots:
+            if team not in TEAMS or not 0 <= robot_id <= MAX_ROBOT_ID:
+                return False
+            float(x), float(y), float(orientation)
+        if packet.ball is not None:
+            x, y = packet.ball
+            float(x), float(y)
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return True
+
+
+class LocalSource:
+    """Fonte em processo para testes: pacotes publicados com `publish` são
+    entregues à thread de ingestão na mesma ordem"""
+
+    def __init__(self, maxsize=0):
+        self._queue = queue.Queue(maxsize)
+
+    def publish(self, packet):
+        self._queue.put(packet)
+
+    def receive(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class WorldIngest:
+    """Recebe pacotes de uma fonte numa thread própria e publica o mais recente
+
+    A troca entre a thread de ingestão e o loop de renderização é feita sem
+    locks: a thread monta um Snapshot novo e troca a referência `_front`
+    (atribuição atômica no CPython); o loop de renderização lê a referência
+    uma vez por frame e compara o `seq` com o último consumido. Pacotes
+    substituídos antes de serem lidos contam como `coalesced`; pacotes
+    inválidos ou mais antigos que o último publicado contam como `dropped`.
+    """
+
+    def __init__(self, source, poll_timeout=0.1):
+        self.source = source
+        self.poll_timeout = poll_timeout
+
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+        self._front = None
+        self._published_seq = 0
+        self._consumed_seq = 0
+        self._last_timestamp = float('-inf')
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='world-ingest', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.source.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            packet = self.source.receive(self.poll_timeout)
+            if packet is None:
+                continue
+            self.received += 1
+            self.publish(packet)
+
+    def publish(self, packet):
+        """Publica um pacote como snapshot mais recente (chamado pela thread)"""
+        if not valid_packet(packet) or packet.timestamp < self._last_timestamp:
+            self.dropped += 1
+            return
+        self._last_timestamp = packet.timestamp
+        self._published_seq += 1
+        self._front = Snapshot(self._published_seq, packet)
+
+    def latest(self):
+        """Pacote mais recente ainda não consumido, ou None (chamado uma vez por frame)"""
+        snapshot = self._front
+        if snapshot is None or snapshot.seq == self._consumed_seq:
+            return None
+        self.coalesced += snapshot.seq - self._consumed_seq - 1
+        self._consumed_seq = snapshot.seq
+        return snapshot.packet
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+        }
+
+
+def make_packet(robots, ball=None, timestamp=None):
+    """Monta um WorldPacket com o horário atual se nenhum for informado"""
+    if timestamp is None:
+        timestamp = time.monotonic()
+    return WorldPacket(timestamp, list(robots), ball)
@@ -0,0 +1,139 @@
+import math
+import time
+
+import numpy as np
+
+# Chave do histórico da bola (os robôs usam (índice do time, id))
+BALL_KEY = (-1, 0)
+
+# Diferença (s) entre os relógios acima da qual o offset da fonte é medido de novo
+CLOCK_RESYNC = 1.0
+
+
+def wrap_angle(angle):
+    """Leva ângulos (radianos) para o intervalo [-pi, pi)"""
+    return (angle + math.pi) % (2*math.pi) - math.pi
+
+
+class SourceClock:
+    """Converte instantes do relógio de uma fonte para o de time.monotonic()
+
+    O offset entre os dois relógios é medido na primeira amostra e mantido,
+    então o intervalo entre amostras é o da captura, sem o atraso variável
+    da rede e do loop de renderização. Se o relógio da fonte salta mais de
+    `resync` segundos (fonte reiniciada, outra máquina), o offset é medido
+    de novo.
+    """
+
+    def __init__(self, resync=CLOCK_RESYNC):
+        self.resync = resync
+        self.offset = None
+
+    def reset(self):
+        self.offset = None
+
+    def to_local(self, t, now=None):
+        """Instante `t` da fonte no relógio monotônico local"""
+        if now is None:
+            now = time.monotonic()
+        if self.offset is None or abs(t + self.offset - now) > self.resync:
+            self.offset = now - t
+        return t + self.offset
+
+
+class PoseEstimator:
+    """Histórico de poses com instante por robô e bola, para desenhar acima da taxa da visão
+
+    Cada objeto tem uma linha com as últimas `history` amostras (a mais nova
+    na última coluna). Na renderização, cada linha é interpolada entre as
+    duas amostras em volta de `t - delay`, ou extrapolada a partir das duas
+    últimas por no máximo `max_extrapolation` segundos. O cálculo é feito de
+    uma vez para todos os objetos, e a orientação segue o menor arco.
+    """
+
+    def __init__(self, history=4, delay=0.0, max_extrapolation=0.1, capacity=32):
+        self.history = history
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+
+        self._rows = {}  # {chave: linha}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.t = np.full((capacity, self.history), -np.inf)
+        self.xy = np.zeros((capacity, self.history, 2))
+        self.theta = np.zeros((capacity, self.history))
+
+    def _row(self, key, x, y, theta):
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self.t):
+                t_old, xy_old, theta_old = self.t, self.xy, self.theta
+                self._allocate(2 * len(t_old))
+                self.t[:row], self.xy[:row], self.theta[:row] = t_old, xy_old, theta_old
+            # Preenche o histórico com a primeira amostra (sem movimento)
+            self.xy[row] = (x, y)
+            self.theta[row] = theta
+            self._rows[key] = row
+        return row
+
+    def observe(self, world, t):
+        """Registra o estado atual do mundo como amostra do instante `t`"""
+        n = world.count
+        keys = zip(world.team[:n].tolist(), world.ids[:n].tolist())
+        rows = [self._row(key, x, y, theta) for key, x, y, theta in zip(
+            keys, world.x[:n].tolist(), world.y[:n].tolist(), world.orientation[:n].tolist())]
+        rows.append(self._row(BALL_KEY, *world.ball_xy.tolist(), 0.0))
+        rows = np.array(rows)
+
+        xy = np.vstack((world.xy[:n], world.ball_xy))
+        theta = np.append(world.orientation[:n], 0.0)
+
+        # Desloca o histórico uma coluna para a esquerda e grava a nova amostra
+        self.t[rows, :-1] = self.t[rows, 1:]
+        self.xy[rows, :-1] = self.xy[rows, 1:]
+        self.theta[rows, :-1] = self.theta[rows, 1:]
+        self.t[rows, -1] = t
+        self.xy[rows, -1] = xy
+        self.theta[rows, -1] = theta
+
+    def estimate(self, world, t, out):
+        """Escreve em `out` os robôs de `world` com poses estimadas para o instante `t`"""
+        out.copy_from(world)
+        n = world.count
+        keys = list(zip(world.team[:n].tolist(), world.ids[:n].tolist()))
+        keys.append(BALL_KEY)
+        if any(key not in self._rows for key in keys):
+            return
+        rows = np.array([self._rows[key] for key in keys])
+
+        times = self.t[rows]
+        render_time = t - self.delay
+
+        # Par de amostras em volta do instante (ou as duas últimas, para extrapolar)
+        after = np.clip((times <= render_time).sum(axis=1), 1, self.history - 1)
+        before = after - 1
+        index = np.arange(len(rows))
+        t0 = times[index, before]
+        t1 = times[index, after]
+
+        # Extrapolação limitada a max_extrapolation depois da última amostra
+        target = np.minimum(render_time, t1 + self.max_extrapolation)
+        span = t1 - t0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            alpha = np.where(np.isfinite(t0) & (span > 0), (target - t0) / span, 1.0)
+        alpha = np.maximum(alpha, 0.0)
+
+        xy0 = self.xy[rows, before]
+        xy1 = self.xy[rows, after]
+        xy = xy0 + (xy1 - xy0) * alpha[:, None]
+
+        theta0 = self.theta[rows, before]
+        theta1 = self.theta[rows, after]
+        # Menor arco entre as amostras; o resultado segue a convenção da amostra anterior
+        theta = theta0 + wrap_angle(theta1 - theta0) * alpha
+
+        out.xy[:n] = xy[:-1]
+        out.orientation[:n] = theta[:-1]
+        out.ball_xy[:] = xy[-1]
@@ -0,0 +1,138 @@
+import argparse
+import math
+import os
+import sys
+
+import pygame
+
+from visualizador import GameMode, RenderResources, SoccerVisualizer, init_pygame
+
+DEFAULT_WINDOW_SIZE = (1600, 900)
+
+
+def tile_rects(count, size, columns=None):
+    """Divide a janela `size` em `count` ladrilhos (Rects) em grade, linha a linha"""
+    columns = columns or math.ceil(math.sqrt(count))
+    rows = math.ceil(count / columns)
+    width, height = size[0] // columns, size[1] // rows
+    return [pygame.Rect((i % columns) * width, (i // columns) * height, width, height)
+            for i in range(count)]
+
+
+class MultiFieldVisualizer:
+    """Vários estados de mundo independentes, cada um num ladrilho da mesma janela
+
+    Cada ladrilho é um SoccerVisualizer desenhando numa subsuperfície da
+    janela, com modalidade, escala e fonte de dados próprias. Fontes, camadas
+    do campo e sprites ficam num único RenderResources, então ladrilhos com a
+    mesma modalidade e escala não repetem esse trabalho. As teclas vão para o
+    ladrilho sob o cursor do mouse, assim como zoom e deslocamento.
+    """
+
+    def __init__(self, modes, size=DEFAULT_WINDOW_SIZE, columns=None, headless=False):
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            init_pygame()
+            self.window = pygame.Surface(size)
+        else:
+            init_pygame()
+            self.window = pygame.display.set_mode(size, pygame.RESIZABLE)
+            pygame.display.set_caption("Robotic Soccer Visualizer - Multi-field")
+        self.resources = RenderResources()
+
+        self.columns = columns
+        self.tiles = tile_rects(len(modes), size, columns)
+        self.views = []
+        for mode, tile in zip(modes, self.tiles):
+            view = SoccerVisualizer(surface=self.window.subsurface(tile),
+                                    resources=self.resources)
+            view.update_game_mode(mode)
+            self.views.append(view)
+
+    def view_at(self, pos):
+        """(visualizador, posição local) do ladrilho que contém `pos`, ou (None, None)"""
+        for view, tile in zip(self.views, self.tiles):
+            if tile.collidepoint(pos):
+                return view, (pos[0] - tile.x, pos[1] - tile.y)
+        return None, None
+
+    def resize(self, window):
+        """Refaz os ladrilhos para a janela redimensionada"""
+        self.window = window
+        self.tiles = tile_rects(len(self.views), window.get_size(), self.columns)
+        for view, tile in zip(self.views, self.tiles):
+            view.resize(window.subsurface(tile))
+
+    def draw(self):
+        """Desenha os ladrilhos e devolve as regiões alteradas em coordenadas da janela"""
+        dirty_rects = []
+        for view, tile in zip(self.views, self.tiles):
+            dirty_rects.extend(rect.move(tile.topleft) for rect in view.draw_frame_dirty())
+        return dirty_rects
+
+    def run(self):
+        clock = pygame.time.Clock()
+        dt = 0.0
+
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    view, _ = self.view_at(pygame.mouse.get_pos())
+                    if view is not None:
+                        view.handle_key(event.key)
+                elif event.type in (pygame.MOUSEWHEEL, pygame.MOUSEMOTION):
+                    view, pos = self.view_at(pygame.mouse.get_pos())
+                    if view is not None:
+                        view.handle_mouse(event, pos)
+                elif event.type == pygame.VIDEORESIZE:
+                    self.resize(pygame.display.set_mode(event.size, pygame.RESIZABLE))
+
+            for view in self.views:
+                view.update_sources(dt)
+                view.refresh_profile_overlay()
+                view.refresh_heatmap_overlay()
+
+            dirty_rects = self.draw()
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            for view in self.views:
+                view.profiler.end_frame()
+            dt = clock.tick(60) / 1000
+
+        for view in self.views:
+            view.close_sources()
+        pygame.quit()
+        sys.exit()
+
+
+def attach_source(view, source):
+    """Liga a fonte descrita por `source` (`udp:GRUPO:PORTA` ou caminho de log) ao ladrilho"""
+    if source.startswith('udp:'):
+        from visao_udp import VisionReceiver
+        _, group, port = source.split(':')
+        view.attach_receiver(VisionReceiver((group, int(port))))
+    else:
+        from gravacao import LogReplay
+        view.attach_replay(LogReplay(source))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vários campos na mesma janela")
+    parser.add_argument("--view", nargs="+", action="append", metavar=("MODALIDADE", "FONTE"),
+                        help="adiciona um ladrilho; FONTE é udp:GRUPO:PORTA ou um log "
+                             "gravado (sem FONTE, usa os robôs de exemplo)")
+    parser.add_argument("--columns", type=int)
+    parser.add_argument("--size", type=int, nargs=2, default=DEFAULT_WINDOW_SIZE,
+                        metavar=("LARGURA", "ALTURA"))
+    args = parser.parse_args()
+
+    specs = args.view or [["SSL"], ["VSSS"]]
+    visualizer = MultiFieldVisualizer([GameMode[spec[0]] for spec in specs],
+                                      size=tuple(args.size), columns=args.columns)
+    for view, spec in zip(visualizer.views, specs):
+        if len(spec) > 1:
+            attach_source(view, spec[1])
+    visualizer.run()
@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+import pygame
+
+# Canais do mapa: um por time (mesma ordem do array `team` do WorldState) e a bola
+CHANNELS = ('blue', 'yellow', 'ball')
+BALL_CHANNEL = 2
+
+# Maior intervalo entre amostras contado como ocupação (fonte parada não acumula)
+MAX_SAMPLE_GAP = 0.25
+# Acima disso os pesos do decaimento são renormalizados
+RESCALE_LIMIT = 1e100
+
+
+def heat_colormap():
+    """Tabela (256,4) RGBA: transparente -> azul -> amarelo -> vermelho"""
+    level = np.linspace(0.0, 1.0, 256)
+    red = np.clip(3 * level - 1, 0, 1)
+    green = np.clip(1.5 - np.abs(3 * level - 1.5), 0, 1)
+    blue = np.clip(1 - 2 * level, 0, 1) * (level > 0)
+    alpha = np.sqrt(level) * 0.8
+    return (np.stack((red, green, blue, alpha), axis=1) * 255).astype(np.uint8)
+
+
+class OccupancyHeatmap:
+    """Histograma 2D de ocupação do campo por time e pela bola
+
+    Cada atualização soma o tempo desde a amostra anterior nas células dos
+    robôs e da bola (O(robôs)). Com `window`, as amostras antigas decaem
+    exponencialmente com constante de tempo `window` segundos: em vez de
+    multiplicar a grade inteira a cada atualização, o peso das amostras novas
+    cresce (exp(t/window)) e a grade só é renormalizada quando esse peso fica
+    grande demais, o que mantém o custo constante mesmo em jogos de horas.
+    """
+
+    def __init__(self, bounds, cell_size, window=None):
+        self.x_min = bounds["x_min"]
+        self.y_min = bounds["y_min"]
+        self.cell_size = cell_size
+        self.nx = int(math.ceil((bounds["x_max"] - bounds["x_min"]) / cell_size))
+        self.ny = int(math.ceil((bounds["y_max"] - bounds["y_min"]) / cell_size))
+        self.window = window
+
+        self.bins = np.zeros((len(CHANNELS), self.ny, self.nx))
+        self.version = 0  # muda a cada amostra acumulada
+        self._weight = 1.0
+        self._t_ref = None
+        self._last_t = None
+
+    def clear(self):
+        self.bins[:] = 0
+        self.version += 1
+        self._weight = 1.0
+        self._t_ref = None
+        self._last_t = None
+
+    def _cells(self, xy):
+        ix = np.clip(((xy[:, 0] - self.x_min) / self.cell_size).astype(np.intp), 0, self.nx - 1)
+        iy = np.clip(((xy[:, 1] - self.y_min) / self.cell_size).astype(np.intp), 0, self.ny - 1)
+        return iy, ix
+
+    def observe(self, world, t):
+        """Acumula o estado atual do mundo como ocupação até o instante `t`"""
+        last_t, self._last_t = self._last_t, t
+        if last_t is None:
+            self._t_ref = t
+            return
+        dt = min(t - last_t, MAX_SAMPLE_GAP)
+        if dt <= 0:
+            return
+
+        if self.window is not None:
+            self._weight = math.exp((t - self._t_ref) / self.window)
+            if self._weight > RESCALE_LIMIT:
+                self.bins /= self._weight
+                self._t_ref = t
+                self._weight = 1.0
+
+        n = world.count
+        iy, ix = self._cells(world.xy[:n])
+        np.add.at(self.bins, (world.team[:n], iy, ix), dt * self._weight)
+        ball_iy, ball_ix = self._cells(world.ball_xy.reshape(1, 2))
+        self.bins[BALL_CHANNEL, ball_iy[0], ball_ix[0]] += dt * self._weight
+        self.version += 1
+
+    def seconds(self, channel):
+        """Grade (ny, nx) de segundos de ocupação (ponderados pelo decaimento) do canal"""
+        return self.bins[CHANNELS.index(channel)] / self._weight
+
+    def render(self, channel, colormap):
+        """Superfície RGBA de nx por ny pixels do canal, normalizada pelo máximo"""
+        values = self.bins[CHANNELS.index(channel)]
+        peak = values.max()
+        levels = np.zeros(values.shape, dtype=np.intp) if peak <= 0 else \
+            (values * (255 / peak)).astype(np.intp)
+        rgba = np.ascontiguousarray(colormap[levels])
+        return pygame.image.frombuffer(rgba.tobytes(), (self.nx, self.ny), 'RGBA')
@@ -0,0 +1,76 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+# Etapas medidas em cada frame do loop principal
+STAGES = ('events', 'update', 'draw_field', 'draw_robot_path', 'draw_robot',
+          'draw_ball', 'draw_info_panel', 'flip')
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """Tempo por etapa de cada frame, guardado numa janela circular de frames
+
+    Uso: `t = profiler.start()` / `profiler.stop('draw_robot', t)` acumulam o
+    tempo da etapa no frame atual (uma etapa pode ser medida várias vezes por
+    frame, ex.: uma vez por robô); `end_frame()` fecha o frame.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.frames = 0
+        self._index = {stage: i for i, stage in enumerate(STAGES)}
+        # Uma linha por etapa e uma última com o tempo total do frame (segundos)
+        self._samples = np.zeros((len(STAGES) + 1, window))
+        self._current = np.zeros(len(STAGES))
+        self._frame_start = time.perf_counter()
+        self.startup = {}  # {marco da partida: segundos desde a criação do visualizador}
+
+    start = staticmethod(time.perf_counter)
+
+    def stop(self, stage, started):
+        self._current[self._index[stage]] += time.perf_counter() - started
+
+    def end_frame(self):
+        now = time.perf_counter()
+        column = self.frames % self.window
+        self._samples[:-1, column] = self._current
+        self._samples[-1, column] = now - self._frame_start
+        self._current[:] = 0
+        self._frame_start = now
+        self.frames += 1
+
+    def percentiles(self):
+        """{etapa: (p50, p95, p99)} em milissegundos, incluindo 'frame'"""
+        filled = min(self.frames, self.window)
+        if not filled:
+            return {}
+        values = np.percentile(self._samples[:, :filled], PERCENTILES, axis=1) * 1000
+        return {stage: tuple(values[:, i].tolist())
+                for i, stage in enumerate(STAGES + ('frame',))}
+
+    def export(self, path):
+        """Grava os percentis em JSON (se o arquivo terminar em .json) ou CSV"""
+        stats = self.percentiles()
+        if path.endswith('.json'):
+            with open(path, 'w') as out:
+                json.dump({
+                    'frames': self.frames,
+                    'window': min(self.frames, self.window),
+                    'unit': 'ms',
+                    'stages': {stage: dict(zip(('p50', 'p95', 'p99'), values))
+                               for stage, values in stats.items()},
+                    'startup_ms': {mark: seconds * 1000
+                                   for mark, seconds in self.startup.items()},
+                }, out, indent=2)
+        else:
+            with open(path, 'w', newline='') as out:
+                writer = csv.writer(out)
+                writer.writerow(['stage', 'p50_ms', 'p95_ms', 'p99_ms'])
+                for stage, values in stats.items():
+                    writer.writerow([stage, *(f"{value:.4f}" for value in values)])
+                # Marcos da partida têm um único valor, repetido nas três colunas
+                for mark, seconds in self.startup.items():
+                    writer.writerow([f"startup_{mark}", *[f"{seconds * 1000:.4f}"] * 3])
@@ -0,0 +1,329 @@
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from visualizador import MAX_ROBOT_ID, TEAMS, Pose2D
+
+# Tópicos assinados pela ponte
+TOPIC_ROBOT_POSE = '/vision/robots'
+TOPIC_BALL = '/vision/ball'
+TOPIC_PLANNED_PATH = '/planner/paths'
+
+# Mensagens já convertidas para as unidades do visualizador (mm, radianos, segundos)
+RobotPoseMsg = namedtuple('RobotPoseMsg', ['stamp', 'robot_id', 'team', 'x', 'y', 'theta'])
+BallMsg = namedtuple('BallMsg', ['stamp', 'x', 'y'])
+# poses: [Pose2D, ...]; caminho vazio apaga o caminho do robô
+PathMsg = namedtuple('PathMsg', ['stamp', 'robot_id', 'poses'])
+
+# Políticas quando a fila está cheia e chega uma chave nova
+DROP_OLDEST = 'oldest'  # descarta a chave pendente mais antiga
+DROP_NEWEST = 'newest'  # descarta a mensagem que chegou
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+
+class LatestByKey:
+    """Fila limitada que guarda só a mensagem mais recente de cada chave
+
+    Mensagens com uma chave já pendente substituem a anterior (`coalesced`);
+    com uma chave nova e a fila em `depth`, a política decide quem é
+    descartado (`dropped`). Mensagens mais antigas que a última entregue
+    para a mesma chave também são descartadas (`stale`). O callback do
+    transporte e o loop de renderização trocam dados sob um lock curto:
+    `drain` só troca o dicionário pendente por um vazio.
+    """
+
+    def __init__(self, depth, policy=DROP_OLDEST):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"política de descarte inválida: {policy!r}")
+        self.depth = depth
+        self.policy = policy
+
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.stale = 0
+
+        self._pending = OrderedDict()
+        self._last_stamp = {}
+        self._lock = threading.Lock()
+
+    def put(self, key, msg):
+        with self._lock:
+            self.received += 1
+            if msg.stamp < self._last_stamp.get(key, float('-inf')):
+                self.stale += 1
+                return
+            self._last_stamp[key] = msg.stamp
+
+            pending = self._pending
+            if key in pending:
+                self.coalesced += 1
+                pending[key] = msg
+                return
+            if len(pending) >= self.depth:
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    return
+                pending.popitem(last=False)
+            pending[key] = msg
+
+    def drop(self):
+        """Conta uma mensagem recebida mas descartada antes de ter chave (ex.: malformada)"""
+        with self._lock:
+            self.received += 1
+            self.dropped += 1
+
+    def drain(self):
+        """Mensagens pendentes {chave: mensagem}, na ordem de chegada das chaves"""
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+        return pending
+
+    def forget(self, key):
+        with self._lock:
+            self._last_stamp.pop(key, None)
+
+    def stats(self):
+        return {'received': self.received, 'coalesced': self.coalesced,
+                'dropped': self.dropped, 'stale': self.stale}
+
+
+class LocalTransport:
+    """Transporte em processo para testes: `publish` chama os callbacks do tópico
+
+    Faz o papel do executor do ROS2; pode ser chamado de qualquer thread.
+    """
+
+    def __init__(self):
+        self._callbacks = {}
+
+    def subscribe(self, topic, callback, on_drop=None):
+        # As mensagens já chegam convertidas: nada é descartado aqui
+        self._callbacks.setdefault(topic, []).append(callback)
+
+    def publish(self, topic, msg):
+        for callback in self._callbacks.get(topic, ()):
+            callback(msg)
+
+    def close(self):
+        self._callbacks.clear()
+
+
+class LocalPublisher:
+    """Publicador de teste com a mesma interface que um nó de visão/planejamento"""
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    def publish_pose(self, robot_id, team, x, y, theta, stamp=None):
+        self.transport.publish(TOPIC_ROBOT_POSE, RobotPoseMsg(
+            time.monotonic() if stamp is None else stamp, robot_id, team, x, y, theta))
+
+    def publish_ball(self, x, y, stamp=None):
+        self.transport.publish(TOPIC_BALL, BallMsg(
+            time.monotonic() if stamp is None else stamp, x, y))
+
+    def publish_path(self, robot_id, poses, stamp=None):
+        self.transport.publish(TOPIC_PLANNED_PATH, PathMsg(
+            time.monotonic() if stamp is None else stamp, robot_id, list(poses)))
+
+
+def _yaw(q):
+    """Ângulo em torno de z de um quaternion (geometry_msgs/Quaternion)"""
+    return math.atan2(2 * (q.w * q.z + q.x * q.y), 1 - 2 * (q.y * q.y + q.z * q.z))
+
+
+def _stamp(header):
+    return header.stamp.sec + header.stamp.nanosec * 1e-9
+
+
+def _robot_id(value):
+    """Id de robô de um frame_id; ValueError se não for inteiro ou não couber no mundo"""
+    robot_id = int(value)
+    if not 0 <= robot_id <= MAX_ROBOT_ID:
+        raise ValueError(f"id de robô fora do intervalo: {robot_id}")
+    return robot_id
+
+
+class Ros2Transport:
+    """Transporte sobre rclpy (importado só aqui), com um executor numa thread
+
+    Convenções das mensagens, em metros como no ROS:
+    - poses: geometry_msgs/PoseStamped, header.frame_id = "<time>/<id>" (ex.: "blue/3")
+    - bola: geometry_msgs/PointStamped
+    - caminhos: nav_msgs/Path, header.frame_id = "<id>" ou "<time>/<id>"
+    A profundidade da fila de QoS é a mesma da ponte. Mensagens fora dessas
+    convenções são descartadas (`on_drop`) em vez de levantar exceção na
+    thread do executor, o que a encerraria.
+    """
+
+    def __init__(self, node_name='soccer_visualizer', depth=10):
+        import rclpy
+        from rclpy.executors import SingleThreadedExecutor
+
+        self._rclpy = rclpy
+        if not rclpy.ok():
+            rclpy.init()
+        self.node = rclpy.create_node(node_name)
+        self.depth = depth
+        self._executor = SingleThreadedExecutor()
+        self._executor.add_node(self.node)
+        self._thread = threading.Thread(target=self._executor.spin, name='ros2-spin',
+                                        daemon=True)
+        self._started = False
+
+    def subscribe(self, topic, callback, on_drop=None):
+        """Assina `topic`; `on_drop()` é chamado para cada mensagem malformada"""
+        from geometry_msgs.msg import PointStamped, PoseStamped
+        from nav_msgs.msg import Path
+
+        if topic == TOPIC_ROBOT_POSE:
+            def convert(msg):
+                team, robot_id = msg.header.frame_id.split('/')
+                if team not in TEAMS:
+                    raise ValueError(f"time desconhecido: {team!r}")
+                position = msg.pose.position
+                return RobotPoseMsg(_stamp(msg.header), _robot_id(robot_id), team,
+                                    position.x * 1000, position.y * 1000,
+                                    _yaw(msg.pose.orientation))
+            msg_type = PoseStamped
+        elif topic == TOPIC_BALL:
+            def convert(msg):
+                return BallMsg(_stamp(msg.header), msg.point.x * 1000, msg.point.y * 1000)
+            msg_type = PointStamped
+        elif topic == TOPIC_PLANNED_PATH:
+            def convert(msg):
+                robot_id = _robot_id(msg.header.frame_id.rsplit('/', 1)[-1])
+                poses = [Pose2D(p.pose.position.x * 1000, p.pose.position.y * 1000,
+                                _yaw(p.pose.orientation)) for p in msg.poses]
+                return PathMsg(_stamp(msg.header), robot_id, poses)
+            msg_type = Path
+        else:
+            raise ValueError(f"tópico desconhecido: {topic}")
+
+        def receive(msg):
+            try:
+                converted = convert(msg)
+            except ValueError:
+                # frame_id fora da convenção: conta e segue (o executor não pode morrer)
+                if on_drop is not None:
+                    on_drop()
+                return
+            callback(converted)
+
+        self.node.create_subscription(msg_type, topic, receive, self.depth)
+        if not self._started:
+            self._started = True
+            self._thread.start()
+
+    def close(self):
+        self._executor.shutdown()
+        self.node.destroy_node()
+        if self._rclpy.ok():
+            self._rclpy.shutdown()
+
+
+class RosBridge:
+    """Liga um transporte (ROS2 ou local) ao visualizador, em lotes por frame
+
+    Os callbacks só guardam a mensagem mais recente por robô (poses e
+    caminhos) e da bola, em filas limitadas a `depth` chaves com a política
+    `policy`; `update` é chamado uma vez por frame e aplica tudo o que chegou
+    numa única atualização do mundo. Uma rajada de caminhos do planejador
+    custa no máximo `depth` caminhos pendentes, e nada fica mais de um frame
+    na fila. Robôs sem pose nova há `stale_after` segundos são removidos,
+    junto com os caminhos dos ids que não estão mais em campo. Mensagens com
+    time ou id que o mundo não aceita contam como descartadas na chegada,
+    qualquer que seja o transporte.
+    """
+
+    def __init__(self, transport, depth=64, policy=DROP_OLDEST, stale_after=1.0):
+        self.transport = transport
+        self.stale_after = stale_after
+
+        self.poses = LatestByKey(depth, policy)
+        self.paths = LatestByKey(depth, policy)
+        self.ball = LatestByKey(1, DROP_OLDEST)
+        self._last_seen = {}  # {(time, robot_id): instante de recepção}
+        self._latest_stamp = None  # maior stamp aplicado ao mundo
+
+        transport.subscribe(TOPIC_ROBOT_POSE, self._on_pose, on_drop=self.poses.drop)
+        transport.subscribe(TOPIC_BALL, lambda msg: self.ball.put(None, msg),
+                            on_drop=self.ball.drop)
+        transport.subscribe(TOPIC_PLANNED_PATH, self._on_path, on_drop=self.paths.drop)
+
+    def _on_pose(self, msg):
+        if msg.team not in TEAMS or not 0 <= msg.robot_id <= MAX_ROBOT_ID:
+            self.poses.drop()
+            return
+        self.poses.put((msg.team, msg.robot_id), msg)
+
+    def _on_path(self, msg):
+        if not 0 <= msg.robot_id <= MAX_ROBOT_ID:
+            self.paths.drop()
+            return
+        self.paths.put(msg.robot_id, msg)
+
+    def update(self, world, robot_paths, now=None):
+        """Aplica as mensagens pendentes ao mundo
+
+        Retorna o maior stamp (s, relógio do ROS) das poses e da bola aplicadas
+        até agora se o mundo mudou, ou None se não mudou.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        for path in self.paths.drain().values():
+            if path.poses:
+                # Lista nova a cada mensagem: o cache de caminhos compara identidade
+                robot_paths[path.robot_id] = path.poses
+            else:
+                robot_paths.pop(path.robot_id, None)
+
+        poses = self.poses.drain()
+        for (team, robot_id), pose in poses.items():
+            world.set_robot(robot_id, pose.x, pose.y, pose.theta, team)
+            self._last_seen[(team, robot_id)] = now
+            self._observe_stamp(pose.stamp)
+        ball = self.ball.drain().get(None)
+        if ball is not None:
+            world.set_ball(ball.x, ball.y)
+            self._observe_stamp(ball.stamp)
+
+        removed = self._remove_stale(world, robot_paths, now)
+        if poses or ball is not None or removed:
+            return self._latest_stamp
+        return None
+
+    def _observe_stamp(self, stamp):
+        if self._latest_stamp is None or stamp > self._latest_stamp:
+            self._latest_stamp = stamp
+
+    def _remove_stale(self, world, robot_paths, now):
+        """Remove robôs sem pose nova há `stale_after` s e os caminhos de ids que sumiram"""
+        n = world.count
+        keep = np.ones(n, dtype=bool)
+        for i, (robot_id, team) in enumerate(zip(world.ids[:n].tolist(),
+                                                 world.team[:n].tolist())):
+            key = (TEAMS[team], robot_id)
+            if now - self._last_seen.get(key, now) > self.stale_after:
+                keep[i] = False
+                del self._last_seen[key]
+                self.poses.forget(key)
+        if keep.all():
+            return False
+        world.retain(keep)
+        present = set(world.ids[:world.count].tolist())
+        for robot_id in [robot_id for robot_id in robot_paths if robot_id not in present]:
+            del robot_paths[robot_id]
+        return True
+
+    def stats(self):
+        return {'poses': self.poses.stats(), 'paths': self.paths.stats(),
+                'ball': self.ball.stats()}
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Módulos do visualizador ficam na raiz do repositório; sem janela nos testes
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
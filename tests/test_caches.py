@@ -0,0 +1,45 @@
+import math
+
+import pygame
+
+from visualizador import BLUE, BoundedCache, RobotSpriteAtlas, init_pygame
+
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+def test_bounded_cache_evicts_least_recently_used_by_bytes():
+    cache = BoundedCache(100, len)
+    cache.put('a', 'x' * 40)
+    cache.put('b', 'x' * 40)
+    cache.get('a')
+    cache.put('c', 'x' * 40)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.nbytes == 80
+
+
+def test_atlas_stays_within_its_budget_while_rendering_lazily():
+    init_pygame()
+    atlas = RobotSpriteAtlas('circle', BLUE, 60, max_bytes=200_000)
+    for step in range(atlas.steps):
+        sprite = atlas.get(step * 2*math.pi / atlas.steps)
+        assert isinstance(sprite, pygame.Surface)
+        assert atlas.nbytes <= atlas.max_bytes
+
+    rendered = [sprite for sprite in atlas._sprites if sprite is not None]
+    assert atlas.nbytes == sum(surface_bytes(sprite) for sprite in rendered)
+    # Um sprite descartado volta a ser renderizado quando é pedido de novo
+    assert atlas.get(0.0) is not None
+
+
+def test_sprite_cache_charges_atlas_limits_up_front():
+    init_pygame()
+    cache = BoundedCache(1_000_000, lambda atlas: atlas.max_bytes)
+    for radius in (40, 50, 60, 70):
+        cache.put(radius, RobotSpriteAtlas('square', BLUE, radius, max_bytes=300_000))
+        for step in range(0, 360, 7):
+            cache.get(radius).get(math.radians(step))
+        assert cache.nbytes <= cache.max_bytes
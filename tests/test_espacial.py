@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from espacial import ALL_PAIRS_LIMIT, SpatialGrid
+
+BOUNDS = {"x_min": -4500, "x_max": 4500, "y_min": -3000, "y_max": 3000}
+
+
+def scattered_points(n, seed=0):
+    """Pontos no campo e uma parte fora dele (até 2 m além das bordas)"""
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform((-4500, -3000), (4500, 3000), size=(n, 2))
+    outside = rng.random(n) < 0.25
+    xy[outside] = rng.uniform((-6500, -5000), (6500, 5000), size=(int(outside.sum()), 2))
+    return xy
+
+
+def brute_force_pairs(xy, distance):
+    i, j = np.triu_indices(len(xy), k=1)
+    dist = np.hypot(*(xy[i] - xy[j]).T)
+    return {(a, b) for a, b, d in zip(i.tolist(), j.tolist(), dist) if d <= distance}
+
+
+@pytest.mark.parametrize('n', [ALL_PAIRS_LIMIT // 2, ALL_PAIRS_LIMIT * 5])
+@pytest.mark.parametrize('distance', [180.0, 700.0])
+def test_pairs_within_matches_brute_force(n, distance):
+    xy = scattered_points(n)
+    grid = SpatialGrid(BOUNDS, 500)
+    grid.rebuild(xy)
+
+    pairs = grid.pairs_within(distance)
+    assert pairs.shape[1] == 2
+    assert np.all(pairs[:, 0] < pairs[:, 1])
+    found = set(map(tuple, pairs.tolist()))
+    assert len(found) == len(pairs)  # sem pares repetidos
+    assert found == brute_force_pairs(xy, distance)
+
+
+def test_nearest_and_query_radius_match_brute_force():
+    xy = scattered_points(200, seed=3)
+    grid = SpatialGrid(BOUNDS, 500)
+    grid.rebuild(xy)
+
+    queries = np.vstack((scattered_points(50, seed=4), [(1e6, -1e6), (-8000, 0)]))
+    for x, y in queries.tolist():
+        dist = np.hypot(xy[:, 0] - x, xy[:, 1] - y)
+        index, distance = grid.nearest(x, y)
+        assert distance == pytest.approx(dist.min())
+        assert dist[index] == pytest.approx(dist.min())
+
+        indices, distances = grid.query_radius(x, y, 800.0)
+        assert set(indices.tolist()) == set(np.flatnonzero(dist <= 800.0).tolist())
+        assert np.allclose(distances, dist[indices])
+
+
+def test_empty_grid():
+    grid = SpatialGrid(BOUNDS, 500)
+    grid.rebuild(np.zeros((0, 2)))
+    assert grid.nearest(0, 0) is None
+    assert grid.pairs_within(100.0).shape == (0, 2)
+    assert len(grid.query_radius(0, 0, 100.0)[0]) == 0
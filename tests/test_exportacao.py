@@ -0,0 +1,37 @@
+import pygame
+import pytest
+
+from exportacao import frame_count
+from gravacao import LogRecorder, LogReplay
+from visualizador import SoccerVisualizer, WorldState
+
+
+def test_frame_count_keeps_last_record_at_log_rate(tmp_path):
+    path = tmp_path / 'partida.log'
+    recorder = LogRecorder(path)
+    world = WorldState()
+    for index in range(200):
+        recorder.record(world, 1000.0 + index / 30)
+    recorder.close()
+
+    assert frame_count(LogReplay(path), 30) == 200
+
+
+class NoTickClock:
+    def tick(self, framerate=0):
+        raise AssertionError("o modo headless não deve limitar o FPS")
+
+
+def test_headless_run_skips_display_and_frame_cap(monkeypatch):
+    visualizer = SoccerVisualizer(headless=True)
+
+    def update(*args):
+        raise AssertionError("o modo headless não tem tela para atualizar")
+
+    monkeypatch.setattr(pygame.display, 'update', update)
+    monkeypatch.setattr(pygame.time, 'Clock', NoTickClock)
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    with pytest.raises(SystemExit):
+        visualizer.run()
+    assert visualizer.profiler.frames == 1
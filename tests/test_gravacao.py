@@ -0,0 +1,79 @@
+import pytest
+
+from gravacao import MAX_SPEED, MIN_SPEED, LogRecorder, LogReplay
+from visualizador import WorldState
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    """Log de 10 registros a 10 Hz; o robô 7 anda 100 mm por registro"""
+    path = tmp_path / 'partida.log'
+    recorder = LogRecorder(path, max_robots=4)
+    world = WorldState()
+    for index in range(10):
+        world.set_robot(7, index * 100.0, -50.0, 0.25, 'yellow')
+        world.set_ball(index * 10.0, 5.0)
+        recorder.record(world, 50.0 + index / 10)
+    recorder.close()
+    return path
+
+
+def test_round_trip_and_seek(log_path):
+    replay = LogReplay(log_path)
+    assert len(replay) == 10
+    assert (replay.start_time, replay.end_time) == (50.0, pytest.approx(50.9))
+
+    replay.seek(50.35)
+    assert replay.index == 3
+    world = WorldState()
+    assert replay.load(world)
+    (robot,) = world.robots()
+    assert (robot.id, robot.x, robot.y, robot.team) == (7, 300.0, -50.0, 'yellow')
+    assert robot.orientation == pytest.approx(0.25)
+    assert tuple(world.ball_xy) == (30.0, 5.0)
+    assert not replay.load(world)  # mesmo registro: nada a recarregar
+
+    # Fora do log a busca fica presa às pontas
+    replay.seek(0.0)
+    assert (replay.index, replay.position) == (0, 50.0)
+    replay.seek(99.0)
+    assert replay.index == 9
+
+
+def test_speed_is_clamped_and_scales_advance(log_path):
+    replay = LogReplay(log_path)
+    replay.set_speed(1000.0)
+    assert replay.speed == MAX_SPEED
+    replay.set_speed(0.0)
+    assert replay.speed == MIN_SPEED
+
+    replay.set_speed(2.0)
+    replay.advance(0.2)
+    assert replay.index == 4
+    replay.paused = True
+    replay.advance(1.0)
+    assert replay.index == 4
+    replay.step(-10)
+    assert replay.index == 0
+
+
+def test_partial_last_record_is_ignored(log_path):
+    with open(log_path, 'ab') as log:
+        log.write(b'\x00' * 17)  # gravação interrompida no meio de um registro
+    replay = LogReplay(log_path)
+    assert len(replay) == 10
+    assert replay.end_time == pytest.approx(50.9)
+
+    # Só um pedaço do primeiro registro: log vazio, mas válido
+    with open(log_path, 'rb') as log:
+        header_and_part = log.read(20)
+    with open(log_path, 'wb') as log:
+        log.write(header_and_part)
+    assert len(LogReplay(log_path)) == 0
+
+
+def test_rejects_files_that_are_not_logs(tmp_path):
+    path = tmp_path / 'outro.bin'
+    path.write_bytes(b'nada a ver')
+    with pytest.raises(ValueError):
+        LogReplay(path)
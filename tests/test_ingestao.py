@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from ingestao import LocalSource, WorldIngest, make_packet
+from visualizador import WorldState
+
+
+def wait_for(ingest, timeout=2.0):
+    """Espera a thread de ingestão publicar algo novo; retorna o pacote"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        packet = ingest.latest()
+        if packet is not None:
+            return packet
+        time.sleep(0.005)
+    pytest.fail("nenhum pacote publicado pela thread de ingestão")
+
+
+@pytest.fixture
+def ingest():
+    source = LocalSource()
+    ingest = WorldIngest(source, poll_timeout=0.01).start()
+    yield source, ingest
+    ingest.stop()
+
+
+def test_packets_reach_the_render_loop(ingest):
+    source, ingest = ingest
+    source.publish(make_packet([(1, 100.0, 200.0, 0.5, 'blue')], ball=(10.0, 20.0),
+                               timestamp=1.0))
+    packet = wait_for(ingest)
+
+    world = WorldState()
+    world.update_robots(packet.robots)
+    world.set_ball(*packet.ball)
+    assert packet.timestamp == 1.0
+    assert world.count == 1
+    assert world.xy[0].tolist() == [100.0, 200.0]
+    assert world.ball_xy.tolist() == [10.0, 20.0]
+    assert ingest.latest() is None  # já consumido
+
+
+def test_latest_coalesces_and_drops_out_of_order(ingest):
+    source, ingest = ingest
+    for timestamp in (1.0, 2.0, 3.0, 2.5):
+        source.publish(make_packet([(1, timestamp, 0.0, 0.0, 'blue')], timestamp=timestamp))
+    deadline = time.monotonic() + 2.0
+    while ingest.received < 4 and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+    packet = ingest.latest()
+    assert packet.timestamp == 3.0
+    assert ingest.stats() == {'received': 4, 'coalesced': 2, 'dropped': 1}
+
+
+def test_invalid_packets_are_dropped_and_ingest_keeps_running(ingest):
+    source, ingest = ingest
+    for packet in (make_packet([], timestamp=1.0)._replace(timestamp=None),
+                   make_packet([(1, 0.0, 0.0, 0.0, 'red')], timestamp=2.0),
+                   make_packet([(2**40, 0.0, 0.0, 0.0, 'blue')], timestamp=3.0),
+                   make_packet([(1, None, 0.0, 0.0, 'blue')], timestamp=4.0),
+                   make_packet([(1, 0.0, 0.0)], timestamp=5.0),
+                   make_packet([], ball=(1.0,), timestamp=6.0),
+                   make_packet([(1, 0.0, 0.0, 0.0, 'blue')], timestamp=7.0)):
+        source.publish(packet)
+
+    assert wait_for(ingest).timestamp == 7.0
+    assert ingest.stats()['dropped'] == 6
@@ -0,0 +1,71 @@
+import math
+
+import pytest
+
+from interpolacao import PoseEstimator, SourceClock, wrap_angle
+from visualizador import WorldState
+
+
+def test_wrap_angle():
+    assert wrap_angle(0.5) == pytest.approx(0.5)
+    assert wrap_angle(math.pi) == pytest.approx(-math.pi)
+    assert wrap_angle(-math.pi) == pytest.approx(-math.pi)
+    assert wrap_angle(3 * math.pi + 0.25) == pytest.approx(-math.pi + 0.25)
+    assert wrap_angle(-2 * math.pi - 0.25) == pytest.approx(-0.25)
+
+
+def observe_moving_robot(estimator, samples):
+    """Robô 1 andando 100 mm em x a cada amostra; a bola segue em y"""
+    world = WorldState()
+    for t, orientation in samples:
+        step = round(t * 10)
+        world.set_robot(1, step * 100.0, 0.0, orientation, 'blue')
+        world.set_ball(0.0, step * 50.0)
+        estimator.observe(world, t)
+    return world
+
+
+def test_interpolates_between_samples_along_shortest_arc():
+    estimator = PoseEstimator()
+    world = observe_moving_robot(estimator, [(0.0, 3.0), (0.1, -3.0)])
+    out = WorldState()
+
+    estimator.estimate(world, 0.05, out)
+    (robot,) = out.robots()
+    assert (robot.x, robot.y) == pytest.approx((50.0, 0.0))
+    assert tuple(out.ball_xy) == pytest.approx((0.0, 25.0))
+    # Entre 3.0 e -3.0 o menor arco passa por pi, não por 0
+    assert abs(wrap_angle(robot.orientation)) == pytest.approx(math.pi, abs=1e-6)
+
+
+def test_extrapolation_is_capped():
+    estimator = PoseEstimator(max_extrapolation=0.1)
+    world = observe_moving_robot(estimator, [(0.0, 0.0), (0.1, 0.2), (0.2, 0.4)])
+    out = WorldState()
+
+    estimator.estimate(world, 0.25, out)
+    (robot,) = out.robots()
+    assert robot.x == pytest.approx(250.0)
+    assert robot.orientation == pytest.approx(0.5)
+
+    # Muito depois da última amostra a pose para em 0.1 s além dela
+    estimator.estimate(world, 5.0, out)
+    (robot,) = out.robots()
+    assert robot.x == pytest.approx(300.0)
+    assert robot.orientation == pytest.approx(0.6)
+    assert tuple(out.ball_xy) == pytest.approx((0.0, 150.0))
+
+
+def test_delay_renders_in_the_past():
+    estimator = PoseEstimator(delay=0.1)
+    world = observe_moving_robot(estimator, [(0.0, 0.0), (0.1, 0.0), (0.2, 0.0)])
+    out = WorldState()
+    estimator.estimate(world, 0.25, out)
+    assert out.robots()[0].x == pytest.approx(150.0)
+
+
+def test_source_clock_keeps_offset_until_jump():
+    clock = SourceClock(resync=1.0)
+    assert clock.to_local(10.0, now=100.0) == 100.0
+    assert clock.to_local(10.5, now=100.7) == 100.5  # atraso da rede não entra
+    assert clock.to_local(50.0, now=101.0) == 101.0  # fonte reiniciada: novo offset
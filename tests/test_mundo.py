@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from visualizador import Ball, Robot, SoccerVisualizer, WorldState
+
+
+@pytest.fixture
+def visualizer():
+    return SoccerVisualizer(headless=True)
+
+
+def test_standalone_robot_and_ball_keep_old_constructors():
+    robot = Robot(3, 10.0, 20.0, 0.5, 'blue')
+    robot.x = 15.0
+    assert (robot.id, robot.x, robot.y, robot.orientation, robot.team) == \
+        (3, 15.0, 20.0, 0.5, 'blue')
+    ball = Ball(1.0, 2.0)
+    assert (ball.x, ball.y) == (1.0, 2.0)
+
+
+def test_views_follow_their_robot_after_retain():
+    world = WorldState()
+    for robot_id in range(3):
+        world.set_robot(robot_id, robot_id * 100.0, 0.0, 0.0, 'blue')
+    first, _, last = world.robots()
+
+    world.retain(np.array([False, True, True]))
+    assert (last.id, last.x) == (2, 200.0)
+    assert [robot.id for robot in world.robots()] == [1, 2]
+    with pytest.raises(KeyError):
+        first.x
+
+
+def test_visualizer_robots_and_ball_can_be_assigned(visualizer):
+    visualizer.robots = [Robot(1, 100.0, 0.0, 0.0, 'blue'), Robot(2, -100.0, 50.0, 1.0, 'yellow')]
+    visualizer.ball = Ball(30.0, 40.0)
+
+    assert [(robot.id, robot.team, robot.x) for robot in visualizer.robots] == \
+        [(1, 'blue', 100.0), (2, 'yellow', -100.0)]
+    assert visualizer.world.ball_xy.tolist() == [30.0, 40.0]
+
+    # Reatribuir a partir das próprias visões também funciona
+    visualizer.robots = visualizer.robots[1:]
+    assert [robot.id for robot in visualizer.robots] == [2]
+
+
+def test_visualizer_robots_cannot_be_mutated_in_place(visualizer):
+    with pytest.raises(AttributeError):
+        visualizer.robots.append(Robot(9, 0.0, 0.0, 0.0, 'blue'))
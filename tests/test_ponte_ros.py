@@ -0,0 +1,81 @@
+import pytest
+
+from ponte_ros import DROP_NEWEST, LocalPublisher, LocalTransport, RosBridge
+from visualizador import Pose2D, WorldState
+
+
+@pytest.fixture
+def bridge():
+    transport = LocalTransport()
+    return RosBridge(transport, depth=4), LocalPublisher(transport)
+
+
+def test_publisher_messages_update_world_and_paths(bridge):
+    bridge, publisher = bridge
+    world, paths = WorldState(), {}
+    publisher.publish_pose(3, 'blue', 100.0, -50.0, 0.25, stamp=10.0)
+    publisher.publish_pose(3, 'yellow', -100.0, 50.0, 1.0, stamp=10.5)
+    publisher.publish_ball(7.0, 8.0, stamp=11.0)
+    publisher.publish_path(3, [Pose2D(0.0, 0.0, 0.0), Pose2D(500.0, 0.0, 0.0)], stamp=10.0)
+
+    assert bridge.update(world, paths, now=0.0) == 11.0
+    assert world.count == 2
+    assert world.xy[:2].tolist() == [[100.0, -50.0], [-100.0, 50.0]]
+    assert world.ball_xy.tolist() == [7.0, 8.0]
+    assert paths[3][-1] == Pose2D(500.0, 0.0, 0.0)
+
+    # Nada pendente: o mundo não muda
+    assert bridge.update(world, paths, now=0.1) is None
+
+
+def test_updates_are_coalesced_per_robot(bridge):
+    bridge, publisher = bridge
+    world = WorldState()
+    for i in range(10):
+        publisher.publish_pose(1, 'blue', float(i), 0.0, 0.0, stamp=float(i))
+    publisher.publish_pose(1, 'blue', -1.0, 0.0, 0.0, stamp=0.5)  # mais antiga
+
+    bridge.update(world, {}, now=0.0)
+    assert world.x[:world.count].tolist() == [9.0]
+    assert bridge.poses.stats() == {'received': 11, 'coalesced': 9, 'dropped': 0, 'stale': 1}
+
+
+def test_full_queue_applies_drop_policy():
+    transport = LocalTransport()
+    bridge = RosBridge(transport, depth=2, policy=DROP_NEWEST)
+    publisher = LocalPublisher(transport)
+    world = WorldState()
+    for robot_id in range(4):
+        publisher.publish_pose(robot_id, 'blue', 0.0, 0.0, 0.0, stamp=1.0)
+
+    bridge.update(world, {}, now=0.0)
+    assert world.ids[:world.count].tolist() == [0, 1]
+    assert bridge.poses.dropped == 2
+
+
+def test_silent_robots_and_their_paths_are_removed(bridge):
+    bridge, publisher = bridge
+    world, paths = WorldState(), {}
+    publisher.publish_pose(1, 'blue', 0.0, 0.0, 0.0, stamp=1.0)
+    publisher.publish_path(1, [Pose2D(0.0, 0.0, 0.0)], stamp=1.0)
+    bridge.update(world, paths, now=0.0)
+
+    assert bridge.update(world, paths, now=bridge.stale_after + 0.1) == 1.0
+    assert world.count == 0
+    assert paths == {}
+
+
+def test_invalid_team_or_id_is_dropped_on_arrival(bridge):
+    bridge, publisher = bridge
+    world, paths = WorldState(), {}
+    publisher.publish_pose(2**33, 'blue', 0.0, 0.0, 0.0, stamp=1.0)
+    publisher.publish_pose(-1, 'blue', 0.0, 0.0, 0.0, stamp=1.0)
+    publisher.publish_pose(1, 'red', 0.0, 0.0, 0.0, stamp=1.0)
+    publisher.publish_path(2**33, [Pose2D(0.0, 0.0, 0.0)], stamp=1.0)
+    publisher.publish_pose(1, 'blue', 5.0, 0.0, 0.0, stamp=1.0)
+
+    assert bridge.update(world, paths, now=0.0) == 1.0
+    assert world.ids[:world.count].tolist() == [1]
+    assert paths == {}
+    assert bridge.poses.dropped == 3
+    assert bridge.paths.dropped == 1
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from trajetorias import TrailBuffer, simplify_polyline
+
+
+def polyline_distance(points, polyline):
+    """Distância de cada ponto (N,2) ao segmento mais próximo da polilinha"""
+    a, b = polyline[:-1], polyline[1:]
+    d = b - a
+    length2 = np.maximum((d ** 2).sum(axis=1), 1e-12)
+    t = np.clip(((points[:, None] - a) * d).sum(axis=2) / length2, 0, 1)
+    nearest = a + t[..., None] * d
+    return np.hypot(*(points[:, None] - nearest).transpose(2, 0, 1)).min(axis=1)
+
+
+def random_walk(n, seed=1):
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.2, n))
+    return np.cumsum(20 * np.column_stack((np.cos(heading), np.sin(heading))), axis=0)
+
+
+def test_simplify_polyline_respects_tolerance():
+    points = random_walk(500)
+    keep = simplify_polyline(points, 10.0)
+    assert keep[0] == 0 and keep[-1] == len(points) - 1
+    assert len(keep) < len(points)
+    assert polyline_distance(points, points[keep]).max() <= 10.0 + 1e-9
+    assert list(simplify_polyline(points[:2], 10.0)) == [0, 1]
+
+
+@pytest.mark.parametrize('tolerance', [5.0, 15.0])
+def test_incremental_simplification_stays_within_tolerance(tolerance):
+    # Janela curta e buffer pequeno: vértices congelados saem da janela e o buffer dá a volta
+    trail = TrailBuffer(capacity=300, window=3.0)
+    for i, (x, y) in enumerate(random_walk(3000)):
+        trail.append(i / 60, x, y)
+        if i % 7 or len(trail) < 2:
+            continue
+        simplified = trail.simplified(tolerance)
+        points = trail.points()
+        assert np.array_equal(simplified[0], points[0])
+        assert np.array_equal(simplified[-1], points[-1])
+        assert polyline_distance(points, simplified).max() <= tolerance + 1e-9
+
+
+def test_tolerance_change_resimplifies_from_scratch():
+    trail = TrailBuffer(capacity=1000, window=100.0)
+    for i, (x, y) in enumerate(random_walk(800)):
+        trail.append(i / 60, x, y)
+    coarse = trail.simplified(40.0)
+    fine = trail.simplified(2.0)
+    assert len(fine) > len(coarse)
+    assert polyline_distance(trail.points(), fine).max() <= 2.0 + 1e-9
+    assert trail.simplified(2.0) is fine  # sem amostras novas: resultado em cache
@@ -0,0 +1,105 @@
+import socket
+import time
+
+import pytest
+
+from visualizador import TEAMS, WorldState
+from visao_udp import ReplaySender, VisionReceiver, encode_detection_frame
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def poll_until(receiver, world, timeout=2.0):
+    """Lê o socket até chegar um frame de detecção; retorna o t_capture"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        t_capture = receiver.poll(world)
+        if t_capture is not None:
+            return t_capture
+        time.sleep(0.005)
+    pytest.fail("nenhum pacote recebido pelo loopback")
+
+
+@pytest.fixture
+def link():
+    port = free_port()
+    receiver = VisionReceiver(('127.0.0.1', port))
+    sender = ReplaySender(('127.0.0.1', port))
+    yield receiver, sender
+    sender.close()
+    receiver.close()
+
+
+def robots_by_key(world):
+    n = world.count
+    return {(TEAMS[team], robot_id): (x, y, orientation) for robot_id, team, x, y, orientation in
+            zip(world.ids[:n].tolist(), world.team[:n].tolist(), world.x[:n].tolist(),
+                world.y[:n].tolist(), world.orientation[:n].tolist())}
+
+
+def test_round_trip_over_loopback(link):
+    receiver, sender = link
+    world = WorldState()
+    sender.send(encode_detection_frame(
+        camera_id=1, frame_number=7, t_capture=1234.5,
+        robots_blue=[(3, 100.0, -200.0, 0.5)],
+        robots_yellow=[(3, -1500.0, 750.0, -1.25), (8, 0.0, 0.0, 3.0)],
+        balls=[(40.0, 60.0)]))
+
+    assert poll_until(receiver, world) == 1234.5
+    robots = robots_by_key(world)
+    assert set(robots) == {('blue', 3), ('yellow', 3), ('yellow', 8)}
+    assert robots[('blue', 3)] == pytest.approx((100.0, -200.0, 0.5))
+    assert robots[('yellow', 3)] == pytest.approx((-1500.0, 750.0, -1.25))
+    assert world.ball_xy.tolist() == pytest.approx([40.0, 60.0])
+    assert receiver.cameras == [1]
+    assert receiver.dropped == 0
+
+
+def test_cameras_update_only_what_they_see(link):
+    receiver, sender = link
+    world = WorldState()
+    sender.send(encode_detection_frame(0, 1, 10.0, robots_blue=[(1, -2000.0, 0.0, 0.0)]))
+    poll_until(receiver, world)
+    sender.send(encode_detection_frame(1, 1, 10.01, robots_blue=[(2, 2000.0, 0.0, 0.0)]))
+    assert poll_until(receiver, world) == 10.01
+
+    assert set(robots_by_key(world)) == {('blue', 1), ('blue', 2)}
+    assert receiver.cameras == [0, 1]
+
+
+def test_malformed_packet_is_dropped(link):
+    receiver, sender = link
+    world = WorldState()
+    sender.send(b'\x0a\xff\xff')
+    sender.send(encode_detection_frame(0, 1, 5.0, robots_blue=[(1, 0.0, 0.0, 0.0)]))
+
+    assert poll_until(receiver, world) == 5.0
+    assert receiver.dropped == 1
+    assert world.count == 1
+
+
+def test_out_of_range_robot_id_is_dropped(link):
+    receiver, sender = link
+    world = WorldState()
+    sender.send(encode_detection_frame(0, 1, 5.0, robots_blue=[(2**40, 0.0, 0.0, 0.0)]))
+    sender.send(encode_detection_frame(0, 2, 5.1, robots_blue=[(65536, 0.0, 0.0, 0.0)]))
+    sender.send(encode_detection_frame(0, 3, 5.2, robots_blue=[(65535, 0.0, 0.0, 0.0)]))
+
+    assert poll_until(receiver, world) == 5.2
+    assert receiver.dropped == 2
+    assert world.ids[:world.count].tolist() == [65535]
+
+
+def test_stale_robots_are_removed(link):
+    receiver, sender = link
+    world = WorldState()
+    sender.send(encode_detection_frame(0, 1, 5.0, robots_blue=[(1, 0.0, 0.0, 0.0)]))
+    poll_until(receiver, world)
+
+    assert receiver.poll(world, now=time.monotonic() + 2 * receiver.stale_after) is None
+    assert world.count == 0
@@ -0,0 +1,158 @@
+from collections import deque
+
+import numpy as np
+
+# Quantas amostras a cauda ainda não congelada pode ter antes de ser fixada
+MAX_TAIL = 64
+
+
+def simplify_polyline(points, tolerance):
+    """Douglas–Peucker: índices dos vértices de `points` (N,2) mantidos com `tolerance`"""
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        segment = points[last] - points[first]
+        relative = points[first + 1:last] - points[first]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            dist = np.hypot(relative[:, 0], relative[:, 1])
+        else:
+            dist = np.abs(segment[0] * relative[:, 1] - segment[1] * relative[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            middle = first + 1 + i
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+    return np.flatnonzero(keep)
+
+
+class TrailBuffer:
+    """Buffer circular de posições (mm) de um objeto nos últimos `window` segundos
+
+    As amostras têm índices absolutos crescentes; o índice `i` fica na posição
+    `i % capacity` dos arrays. A versão simplificada é mantida de forma
+    incremental: os vértices já congelados não são recalculados, só a cauda
+    desde o último vértice congelado passa de novo pelo Douglas–Peucker.
+    """
+
+    def __init__(self, capacity=1800, window=30.0):
+        self.capacity = capacity
+        self.window = window
+        self.t = np.zeros(capacity)
+        self.xy = np.zeros((capacity, 2))
+        self.head = 0  # índice absoluto da amostra mais antiga
+        self.total = 0  # índice absoluto da próxima amostra
+
+        self._tolerance = None
+        self._frozen = deque()
+        self._cached = None
+        self._cached_key = None
+
+    def __len__(self):
+        return self.total - self.head
+
+    @property
+    def last_time(self):
+        return self.t[(self.total - 1) % self.capacity] if len(self) else float('-inf')
+
+    def append(self, t, x, y):
+        if len(self):
+            last = (self.total - 1) % self.capacity
+            if self.xy[last, 0] == x and self.xy[last, 1] == y:
+                return
+        i = self.total % self.capacity
+        self.t[i] = t
+        self.xy[i, 0] = x
+        self.xy[i, 1] = y
+        self.total += 1
+
+        # Descarta o que saiu da janela (por capacidade ou por tempo)
+        self.head = max(self.head, self.total - self.capacity)
+        while self.head < self.total - 1 and self.t[self.head % self.capacity] < t - self.window:
+            self.head += 1
+
+    def points(self, start=None, stop=None):
+        """Amostras [start, stop) em ordem, como array (N,2) em mm"""
+        start = self.head if start is None else start
+        stop = self.total if stop is None else stop
+        return np.take(self.xy, np.arange(start, stop) % self.capacity, axis=0)
+
+    def simplified(self, tolerance):
+        """Polilinha simplificada (N,2) em mm, com erro máximo de `tolerance` mm"""
+        if len(self) < 2:
+            return self.points()
+        key = (self.head, self.total, tolerance)
+        if key == self._cached_key:
+            return self._cached
+
+        frozen = self._frozen
+        if tolerance != self._tolerance or not frozen:
+            # Escala nova: recomeça a partir da amostra mais antiga
+            self._tolerance = tolerance
+            frozen.clear()
+            frozen.append(self.head)
+
+        # Vértices que saíram da janela
+        while len(frozen) > 1 and frozen[1] <= self.head:
+            frozen.popleft()
+        if frozen[0] < self.head:
+            if len(frozen) > 1:
+                # O primeiro trecho perdeu o começo: simplifica de novo só ele
+                span = self.head + simplify_polyline(self.points(self.head, frozen[1] + 1),
+                                                     tolerance)
+                frozen.popleft()
+                frozen.extendleft(reversed(span[:-1].tolist()))
+            else:
+                frozen[0] = self.head
+
+        # Simplifica a cauda, congelando-a em blocos para manter o custo limitado
+        while True:
+            anchor = frozen[-1]
+            keep = anchor + simplify_polyline(self.points(anchor, self.total), tolerance)
+            if self.total - anchor <= MAX_TAIL:
+                break
+            frozen.extend(keep[1:].tolist())
+
+        indices = np.concatenate((np.fromiter(frozen, dtype=np.int64), keep[1:]))
+        self._cached = np.take(self.xy, indices % self.capacity, axis=0)
+        self._cached_key = key
+        return self._cached
+
+
+class TrajectoryHistory:
+    """Trajetórias recentes de cada robô (por (time, id)) e da bola"""
+
+    def __init__(self, window=30.0, rate=60):
+        self.window = window
+        self.capacity = int(window * rate)
+        self.robots = {}
+        self.ball = TrailBuffer(self.capacity, window)
+
+    def record(self, world, t):
+        n = world.count
+        for robot_id, team, x, y in zip(world.ids[:n].tolist(), world.team[:n].tolist(),
+                                        world.x[:n].tolist(), world.y[:n].tolist()):
+            trail = self.robots.get((team, robot_id))
+            if trail is None:
+                trail = self.robots[(team, robot_id)] = TrailBuffer(self.capacity, self.window)
+            trail.append(t, x, y)
+        self.ball.append(t, *world.ball_xy.tolist())
+
+        # Robôs que sumiram há mais tempo que a janela
+        stale = [key for key, trail in self.robots.items()
+                 if trail.last_time < t - self.window]
+        for key in stale:
+            del self.robots[key]
+
+    def clear(self):
+        self.robots.clear()
+        self.ball = TrailBuffer(self.capacity, self.window)
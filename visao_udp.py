@@ -0,0 +1,306 @@
+import socket
+import struct
+import time
+
+import numpy as np
+
+from visualizador import MAX_ROBOT_ID, TEAMS
+
+# Endereços multicast padrão
+SSL_VISION_ADDRESS = ('224.5.23.2', 10006)
+VSSS_VISION_ADDRESS = ('224.0.0.1', 10002)
+
+# Maior datagrama UDP possível
+MAX_DATAGRAM = 65536
+
+# Tipos de campo do formato binário do protobuf
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH = 2
+WIRE_FIXED32 = 5
+
+# Campos de SSL_WrapperPacket / SSL_DetectionFrame / SSL_Detection{Ball,Robot}
+# (mesmo esquema usado pela visão do VSSS)
+WRAPPER_DETECTION = 1
+FRAME_NUMBER = 1
+FRAME_T_CAPTURE = 2
+FRAME_T_SENT = 3
+FRAME_CAMERA_ID = 4
+FRAME_BALLS = 5
+FRAME_ROBOTS_YELLOW = 6
+FRAME_ROBOTS_BLUE = 7
+DETECTION_CONFIDENCE = 1
+ROBOT_ID = 2
+DETECTION_X = 3
+DETECTION_Y = 4
+ROBOT_ORIENTATION = 5
+
+
+def _read_varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _skip_field(buf, pos, wire_type):
+    if wire_type == WIRE_VARINT:
+        return _read_varint(buf, pos)[1]
+    if wire_type == WIRE_FIXED64:
+        return pos + 8
+    if wire_type == WIRE_LENGTH:
+        length, pos = _read_varint(buf, pos)
+        return pos + length
+    if wire_type == WIRE_FIXED32:
+        return pos + 4
+    raise ValueError(f"Tipo de campo protobuf não suportado: {wire_type}")
+
+
+def _read_detection(buf, pos, end):
+    """Lê (confiança, id, x, y, orientação) de uma detecção de robô ou bola"""
+    confidence = 0.0
+    robot_id = 0
+    x = y = orientation = 0.0
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == WIRE_FIXED32 and field in (DETECTION_CONFIDENCE, DETECTION_X,
+                                                    DETECTION_Y, ROBOT_ORIENTATION):
+            value = struct.unpack_from('<f', buf, pos)[0]
+            pos += 4
+            if field == DETECTION_CONFIDENCE:
+                confidence = value
+            elif field == DETECTION_X:
+                x = value
+            elif field == DETECTION_Y:
+                y = value
+            else:
+                orientation = value
+        elif wire_type == WIRE_VARINT and field == ROBOT_ID:
+            robot_id, pos = _read_varint(buf, pos)
+            if robot_id > MAX_ROBOT_ID:
+                raise ValueError(f"id de robô fora do intervalo: {robot_id}")
+        else:
+            pos = _skip_field(buf, pos, wire_type)
+    return confidence, robot_id, x, y, orientation
+
+
+class VisionReceiver:
+    """Receptor UDP (multicast) de pacotes de detecção no formato SSL-Vision
+
+    Os datagramas são lidos com `recv_into` num buffer pré-alocado e
+    decodificados direto do memoryview, escrevendo no WorldState sem montar
+    objetos intermediários. Cada câmera atualiza apenas os robôs que vê; um
+    robô que nenhuma câmera vê há `stale_after` segundos é removido. A bola é
+    a detecção de maior confiança do frame mais recente que a contém.
+    """
+
+    def __init__(self, address=SSL_VISION_ADDRESS, interface='0.0.0.0',
+                 min_confidence=0.0, stale_after=0.5, recv_buffer_size=4 << 20):
+        self.address = address
+        self.min_confidence = min_confidence
+        self.stale_after = stale_after
+
+        self.received = 0
+        self.dropped = 0  # pacotes malformados
+
+        self._buffer = bytearray(MAX_DATAGRAM)
+        self._view = memoryview(self._buffer)
+        self._last_seen = {}  # {(time, robot_id): instante de recepção}
+        self._cameras = set()  # câmeras que já enviaram frames
+
+        group, port = address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer_size)
+        self.sock.bind(('', port))
+        if group and socket.inet_aton(group)[0] & 0xf0 == 0xe0:
+            membership = socket.inet_aton(group) + socket.inet_aton(interface)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        self.sock.setblocking(False)
+
+    def poll(self, world, now=None):
+        """Esvazia o socket aplicando cada pacote ao WorldState
+
+        Retorna o maior t_capture (s, relógio da visão) dos frames de detecção
+        aplicados, ou None se nenhum chegou.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        latest = None
+        while True:
+            try:
+                size = self.sock.recv_into(self._buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            self.received += 1
+            try:
+                t_capture = self.decode_wrapper(world, self._view[:size], now)
+            except (IndexError, ValueError, struct.error):
+                self.dropped += 1
+                continue
+            if t_capture is not None and (latest is None or t_capture > latest):
+                latest = t_capture
+
+        if self._last_seen:
+            self._remove_stale(world, now)
+        return latest
+
+    def decode_wrapper(self, world, buf, now):
+        """Decodifica um SSL_WrapperPacket; retorna o t_capture da detecção (None sem ela)
+
+        Pacotes de geometria são ignorados.
+        """
+        t_capture = None
+        pos, end = 0, len(buf)
+        while pos < end:
+            key, pos = _read_varint(buf, pos)
+            field, wire_type = key >> 3, key & 0x7
+            if field == WRAPPER_DETECTION and wire_type == WIRE_LENGTH:
+                length, pos = _read_varint(buf, pos)
+                t_capture = self.decode_detection_frame(world, buf, pos, pos + length, now)
+                pos += length
+            else:
+                pos = _skip_field(buf, pos, wire_type)
+        return t_capture
+
+    def decode_detection_frame(self, world, buf, pos, end, now):
+        best_ball = None
+        t_capture = now  # frames sem t_capture valem pela chegada
+        while pos < end:
+            key, pos = _read_varint(buf, pos)
+            field, wire_type = key >> 3, key & 0x7
+            if wire_type == WIRE_LENGTH and field in (FRAME_BALLS, FRAME_ROBOTS_YELLOW,
+                                                      FRAME_ROBOTS_BLUE):
+                length, pos = _read_varint(buf, pos)
+                confidence, robot_id, x, y, orientation = _read_detection(
+                    buf, pos, pos + length)
+                pos += length
+                if confidence < self.min_confidence:
+                    continue
+
+                if field == FRAME_BALLS:
+                    if best_ball is None or confidence > best_ball[0]:
+                        best_ball = (confidence, x, y)
+                else:
+                    team = 'yellow' if field == FRAME_ROBOTS_YELLOW else 'blue'
+                    world.set_robot(robot_id, x, y, orientation, team)
+                    self._last_seen[(team, robot_id)] = now
+            elif wire_type == WIRE_VARINT and field == FRAME_CAMERA_ID:
+                camera_id, pos = _read_varint(buf, pos)
+                self._cameras.add(camera_id)
+            elif wire_type == WIRE_FIXED64 and field == FRAME_T_CAPTURE:
+                t_capture, = struct.unpack_from('<d', buf, pos)
+                pos += 8
+            else:
+                pos = _skip_field(buf, pos, wire_type)
+
+        if best_ball is not None:
+            world.set_ball(best_ball[1], best_ball[2])
+        return t_capture
+
+    def _remove_stale(self, world, now):
+        n = world.count
+        keep = np.ones(n, dtype=bool)
+        for i, (robot_id, team) in enumerate(zip(world.ids[:n].tolist(),
+                                                 world.team[:n].tolist())):
+            key = (TEAMS[team], robot_id)
+            if now - self._last_seen.get(key, now) > self.stale_after:
+                keep[i] = False
+                del self._last_seen[key]
+        if not keep.all():
+            world.retain(keep)
+
+    @property
+    def cameras(self):
+        """IDs das câmeras já vistas"""
+        return sorted(self._cameras)
+
+    def close(self):
+        self.sock.close()
+
+
+def _encode_varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _encode_key(field, wire_type):
+    return _encode_varint((field << 3) | wire_type)
+
+
+def _encode_message(field, payload):
+    return _encode_key(field, WIRE_LENGTH) + _encode_varint(len(payload)) + payload
+
+
+def _encode_float(field, value):
+    return _encode_key(field, WIRE_FIXED32) + struct.pack('<f', value)
+
+
+def encode_detection_frame(camera_id, frame_number, t_capture,
+                           robots_blue=(), robots_yellow=(), balls=()):
+    """Monta um SSL_WrapperPacket com um frame de detecção
+
+    robots_*: [(id, x_mm, y_mm, orientation_rad), ...]
+    balls: [(x_mm, y_mm), ...]
+    """
+    frame = (_encode_key(FRAME_NUMBER, WIRE_VARINT) + _encode_varint(frame_number)
+             + _encode_key(FRAME_T_CAPTURE, WIRE_FIXED64) + struct.pack('<d', t_capture)
+             + _encode_key(FRAME_T_SENT, WIRE_FIXED64) + struct.pack('<d', t_capture)
+             + _encode_key(FRAME_CAMERA_ID, WIRE_VARINT) + _encode_varint(camera_id))
+
+    for x, y in balls:
+        frame += _encode_message(FRAME_BALLS, _encode_float(DETECTION_CONFIDENCE, 1.0)
+                                 + _encode_float(DETECTION_X, x)
+                                 + _encode_float(DETECTION_Y, y))
+
+    for field, robots in ((FRAME_ROBOTS_YELLOW, robots_yellow),
+                          (FRAME_ROBOTS_BLUE, robots_blue)):
+        for robot_id, x, y, orientation in robots:
+            frame += _encode_message(field, _encode_float(DETECTION_CONFIDENCE, 1.0)
+                                     + _encode_key(ROBOT_ID, WIRE_VARINT)
+                                     + _encode_varint(robot_id)
+                                     + _encode_float(DETECTION_X, x)
+                                     + _encode_float(DETECTION_Y, y)
+                                     + _encode_float(ROBOT_ORIENTATION, orientation))
+
+    return _encode_message(WRAPPER_DETECTION, frame)
+
+
+class ReplaySender:
+    """Envia pacotes já codificados para um endereço UDP local (testes e replay)"""
+
+    def __init__(self, address=('127.0.0.1', SSL_VISION_ADDRESS[1])):
+        self.address = address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+
+    def send(self, packet):
+        self.sock.sendto(packet, self.address)
+
+    def replay(self, packets, rate=60.0):
+        """Envia os pacotes na taxa indicada (pacotes por segundo)"""
+        interval = 1.0 / rate
+        next_send = time.monotonic()
+        for packet in packets:
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.send(packet)
+            next_send += interval
+
+    def close(self):
+        self.sock.close()
@@ -1,8 +1,22 @@
+import argparse
+import json
+import os
 import pygame
 import sys
 import math
+import numpy as np
 from enum import Enum
+from collections import OrderedDict, deque, namedtuple
+from types import MappingProxyType
 import random
+import time
+
+from camera import Camera
+from espacial import SpatialGrid
+from interpolacao import PoseEstimator, SourceClock
+from ocupacao import CHANNELS as HEATMAP_CHANNELS, OccupancyHeatmap, heat_colormap
+from perfil import FrameProfiler
+from trajetorias import TrajectoryHistory
 
 # Configurações do Pygame
 WINDOW_WIDTH = 1000
@@ -21,6 +35,19 @@ GRAY = (200, 200, 200)
 RED = (255, 0, 0)
 
 
+# Ponto de um caminho planejado (mm, mm, radianos)
+Pose2D = namedtuple('Pose2D', ['x', 'y', 'theta'])
+
+# Tolerância (pixels) da simplificação das trajetórias desenhadas
+TRAIL_TOLERANCE_PX = 1.0
+
+# Folga (mm) entre robô e bola para considerar posse de bola
+POSSESSION_MARGIN = 30
+
+# Janela (s) do mapa de calor de ocupação; None acumula o jogo inteiro
+HEATMAP_WINDOW = 60.0
+
+
 class GameMode(Enum):
     SSL = 1
     VSSS = 2
@@ -52,49 +79,626 @@ MODALITY_PARAMS = {
 }
 
 
+# Geometria derivada dos parâmetros de uma modalidade (mm), imutável
+ModalityGeometry = namedtuple('ModalityGeometry', [
+    'field_w', 'field_h', 'bounds', 'x_min', 'x_max', 'y_min', 'y_max',
+    'robot_radius', 'robot_shape', 'ball_radius', 'possession_distance', 'collision_distance',
+    'goal_w', 'goal_d', 'goal_area_w', 'goal_area_h', 'center_circle_radius',
+    'goal_polygons', 'cross_marks', 'cross_size', 'corner_marks', 'corner_size'])
+
+
+def compile_geometry(mode, params):
+    """Calcula uma vez tudo o que o desenho deriva de MODALITY_PARAMS[mode]"""
+    bounds = params["field_bounds"]
+    x_min, x_max = bounds["x_min"], bounds["x_max"]
+    y_min, y_max = bounds["y_min"], bounds["y_max"]
+    goal_w, goal_d, _ = params["goal_size"]
+
+    # Goleiras: boca na linha de fundo, fundo a goal_d mm para fora
+    goal_polygons = MappingProxyType({
+        'left': ((x_min, -goal_w/2), (x_min - goal_d, -goal_w/2),
+                 (x_min - goal_d, goal_w/2), (x_min, goal_w/2)),
+        'right': ((x_max, -goal_w/2), (x_max + goal_d, -goal_w/2),
+                  (x_max + goal_d, goal_w/2), (x_max, goal_w/2)),
+    })
+
+    cross_marks = corner_marks = ()
+    if mode == GameMode.VSSS:
+        # Marcas em '+' (cruzamentos): centros esquerdo/direito, superiores e inferiores
+        cross_marks = tuple((side * x_max/2, row * y_max/2.6)
+                            for row in (0, 1, -1) for side in (-1, 1))
+        # Cantos chanfrados (diagonais), a 70 mm do canto: (x, y, dir_x, dir_y)
+        corner_offset = 70
+        corner_marks = (
+            (x_min + corner_offset, y_max - corner_offset, 1, -1),   # Superior esquerdo
+            (x_max - corner_offset, y_max - corner_offset, -1, -1),  # Superior direito
+            (x_min + corner_offset, y_min + corner_offset, 1, 1),    # Inferior esquerdo
+            (x_max - corner_offset, y_min + corner_offset, -1, 1),   # Inferior direito
+        )
+
+    return ModalityGeometry(
+        field_w=params["field_size"][0], field_h=params["field_size"][1],
+        bounds=MappingProxyType(dict(bounds)),
+        x_min=x_min, x_max=x_max, y_min=y_min, y_max=y_max,
+        robot_radius=params["robot_radius"], robot_shape=params["robot_shape"],
+        ball_radius=params["ball_radius"],
+        possession_distance=params["robot_radius"] + params["ball_radius"] + POSSESSION_MARGIN,
+        collision_distance=2 * params["robot_radius"],
+        goal_w=goal_w, goal_d=goal_d,
+        goal_area_w=params["goalkeeper_area_size"][0],
+        goal_area_h=params["goalkeeper_area_size"][1],
+        center_circle_radius=params["center_circle_size"] / 2,
+        goal_polygons=goal_polygons,
+        cross_marks=cross_marks, cross_size=20,
+        corner_marks=corner_marks, corner_size=70)
+
+
+MODALITY_GEOMETRY = {mode: compile_geometry(mode, params)
+                     for mode, params in MODALITY_PARAMS.items()}
+
+
+# Times na ordem usada pelo array `team` do WorldState
+TEAMS = ('blue', 'yellow')
+
+# Maior id de robô aceito das fontes de dados (cabe no campo `id`, u2, dos logs)
+MAX_ROBOT_ID = 0xFFFF
+
+# Memória máxima dos caches compartilhados de camadas do campo e de sprites
+LAYER_CACHE_BYTES = 64 << 20
+SPRITE_CACHE_BYTES = 32 << 20
+# Atlas que cabem juntos no cache de sprites (2 times em 2 escalas); cada um
+# fica limitado a essa fração do cache
+ATLASES_PER_CACHE = 4
+
+# Camadas do campo com mais de LAYER_TILE_FACTOR vezes a área da vista (zoom
+# alto) cobrem só um recorte: a vista mais TILE_MARGIN dela de cada lado
+LAYER_TILE_FACTOR = 4
+TILE_MARGIN = 0.25
+
+
 class Robot:
+    """Robô do WorldState, identificado pelo par (time, id)
+
+    `Robot(robot_id, x, y, orientation, team)` cria um robô avulso (guardado
+    num WorldState próprio de uma linha), como antes dos arrays. As visões
+    devolvidas por `WorldState.robots()` são ligadas à chave (time, id), não
+    ao índice: como `retain` e `update_robots` compactam os arrays, o índice
+    de um robô pode mudar entre atualizações e uma visão presa ao índice
+    passaria a mostrar outro robô. Cada acesso resolve o índice pela chave;
+    acessar a visão de um robô que saiu do mundo levanta KeyError.
+    """
+    __slots__ = ('_world', '_key')
+
     def __init__(self, robot_id, x, y, orientation, team):
-        self.id = robot_id
-        self.x = x  # mm (coordenadas centradas no meio do campo)
-        self.y = y  # mm (coordenadas centradas no meio do campo)
-        self.orientation = orientation  # radianos (0 no eixo X)
-        self.team = team  # 'blue' ou 'yellow'
+        self._world = WorldState(1)
+        self._world.set_robot(robot_id, x, y, orientation, team)
+        self._key = (team, robot_id)
+
+    @classmethod
+    def bound(cls, world, key):
+        """Visão do robô `key` = (time, id) guardado em `world`"""
+        robot = cls.__new__(cls)
+        robot._world = world
+        robot._key = key
+        return robot
+
+    @property
+    def _index(self):
+        return self._world._slots[self._key]
+
+    @property
+    def id(self):
+        return self._key[1]
+
+    @property
+    def x(self):
+        return float(self._world.x[self._index])  # mm (coordenadas centradas no meio do campo)
+
+    @x.setter
+    def x(self, value):
+        self._world.x[self._index] = value
+
+    @property
+    def y(self):
+        return float(self._world.y[self._index])  # mm (coordenadas centradas no meio do campo)
+
+    @y.setter
+    def y(self, value):
+        self._world.y[self._index] = value
+
+    @property
+    def orientation(self):
+        return float(self._world.orientation[self._index])  # radianos (0 no eixo X)
+
+    @orientation.setter
+    def orientation(self, value):
+        self._world.orientation[self._index] = value
+
+    @property
+    def team(self):
+        return self._key[0]  # 'blue' ou 'yellow'
 
 
 class Ball:
-    def __init__(self, x, y):
-        self.x = x  # mm (coordenadas centradas no meio do campo)
-        self.y = y  # mm (coordenadas centradas no meio do campo)
+    """Bola: avulsa (`Ball(x, y)`) ou visão de `WorldState.ball_xy`"""
+    __slots__ = ('_xy',)
+
+    def __init__(self, x=0.0, y=0.0):
+        self._xy = np.array([x, y], dtype=float)
+
+    @classmethod
+    def bound(cls, world):
+        ball = cls.__new__(cls)
+        ball._xy = world.ball_xy  # atualizado sempre no lugar
+        return ball
+
+    @property
+    def x(self):
+        return float(self._xy[0])  # mm (coordenadas centradas no meio do campo)
+
+    @x.setter
+    def x(self, value):
+        self._xy[0] = value
+
+    @property
+    def y(self):
+        return float(self._xy[1])  # mm (coordenadas centradas no meio do campo)
+
+    @y.setter
+    def y(self, value):
+        self._xy[1] = value
+
+
+class WorldState:
+    """Estado do mundo em arrays pré-alocados, atualizado no lugar por (time, id)
+
+    Os robôs ativos ocupam os índices [0, count) de cada array, na ordem em que
+    apareceram. `x` e `y` são visões das colunas de `xy`.
+    """
+
+    def __init__(self, capacity=32):
+        self.count = 0
+        self.ids = np.zeros(capacity, dtype=np.int32)
+        self.xy = np.zeros((capacity, 2))
+        self.orientation = np.zeros(capacity)
+        self.team = np.zeros(capacity, dtype=np.int8)  # índice em TEAMS
+        self.x = self.xy[:, 0]
+        self.y = self.xy[:, 1]
+        self.ball_xy = np.zeros(2)
+        self.ball = Ball.bound(self)
+
+        self._slots = {}  # {(time, robot_id): índice}
+        self._views = {}  # {(time, robot_id): Robot}
+
+    def _grow(self, capacity):
+        n = self.count
+        ids, xy = self.ids, self.xy
+        orientation, team = self.orientation, self.team
+
+        self.ids = np.zeros(capacity, dtype=np.int32)
+        self.xy = np.zeros((capacity, 2))
+        self.orientation = np.zeros(capacity)
+        self.team = np.zeros(capacity, dtype=np.int8)
+        self.ids[:n] = ids[:n]
+        self.xy[:n] = xy[:n]
+        self.orientation[:n] = orientation[:n]
+        self.team[:n] = team[:n]
+        self.x = self.xy[:, 0]
+        self.y = self.xy[:, 1]
+
+    def set_robot(self, robot_id, x, y, orientation, team):
+        """Atualiza (ou insere) um robô e retorna seu índice"""
+        key = (team, robot_id)
+        index = self._slots.get(key)
+        if index is None:
+            index = self.count
+            if index == len(self.ids):
+                self._grow(2 * len(self.ids))
+            self.ids[index] = robot_id
+            self.team[index] = TEAMS.index(team)
+            self._slots[key] = index
+            self.count += 1
+
+        self.xy[index, 0] = x
+        self.xy[index, 1] = y
+        self.orientation[index] = orientation
+        return index
+
+    def set_ball(self, x, y):
+        self.ball_xy[0] = x
+        self.ball_xy[1] = y
+
+    def update_robots(self, detections):
+        """Aplica uma detecção completa: (id, x, y, orientação, time) por robô
+
+        Robôs ausentes da detecção são removidos, preservando a ordem dos demais.
+        """
+        previous = self.count
+        seen = np.zeros(previous, dtype=bool)
+        for robot_id, x, y, orientation, team in detections:
+            index = self.set_robot(robot_id, x, y, orientation, team)
+            if index < previous:
+                seen[index] = True
+
+        if not seen.all():
+            keep = np.ones(self.count, dtype=bool)
+            keep[:previous] = seen
+            self.retain(keep)
+
+    def retain(self, mask):
+        """Mantém apenas os robôs marcados em `mask` (tamanho count)"""
+        n = int(mask.sum())
+        self.ids[:n] = self.ids[:self.count][mask]
+        self.xy[:n] = self.xy[:self.count][mask]
+        self.orientation[:n] = self.orientation[:self.count][mask]
+        self.team[:n] = self.team[:self.count][mask]
+        self.count = n
+        self._slots = {(TEAMS[team], robot_id): i for i, (robot_id, team) in
+                       enumerate(zip(self.ids[:n].tolist(), self.team[:n].tolist()))}
+
+    def clear(self):
+        self.count = 0
+        self._slots.clear()
+
+    def copy_from(self, other):
+        """Copia o estado de outro WorldState (mesmos robôs, na mesma ordem)"""
+        n = other.count
+        if n > len(self.ids):
+            self._grow(len(other.ids))
+        self.ids[:n] = other.ids[:n]
+        self.xy[:n] = other.xy[:n]
+        self.orientation[:n] = other.orientation[:n]
+        self.team[:n] = other.team[:n]
+        self.ball_xy[:] = other.ball_xy
+        if self.count != n or self._slots != other._slots:
+            self._slots = dict(other._slots)
+        self.count = n
+
+    def robots(self):
+        """Visões Robot dos robôs ativos, na ordem dos arrays (reaproveitadas entre chamadas)"""
+        views = self._views
+        if list(views) != list(self._slots):
+            # `_slots` segue a ordem dos índices: set_robot insere no fim e retain preserva a ordem
+            self._views = views = {key: views.get(key) or Robot.bound(self, key)
+                                   for key in self._slots}
+        return tuple(views.values())
+
+
+class TextCache:
+    """Cache LRU limitado de superfícies de texto, indexado por (fonte, texto, cor)"""
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+class RobotSpriteAtlas:
+    """Sprites de um robô pré-renderizados em orientações quantizadas
+
+    Cada uma das `steps` orientações é renderizada na primeira vez que é usada
+    e reaproveitada até o atlas ser descartado (mudança de escala ou modalidade).
+    A memória dos sprites não passa de `max_bytes`: acima disso os sprites
+    renderizados há mais tempo são descartados (e refeitos se voltarem a ser
+    usados), então `max_bytes` é o custo do atlas para o cache desde o início.
+    """
+
+    def __init__(self, shape, color, radius_px, steps=360, max_bytes=None):
+        self.shape = shape
+        self.color = color
+        self.radius_px = radius_px
+        self.steps = steps
+        # Limite superior de um sprite: círculo com margem ou quadrado girado 45°
+        side = 2*radius_px + 4 if shape == "circle" else int(math.ceil(2*radius_px*math.sqrt(2))) + 2
+        full = steps * side * side * 4
+        self.max_bytes = full if max_bytes is None else min(max_bytes, full)
+        self.nbytes = 0  # memória dos sprites renderizados no momento
+        self._sprites = [None] * steps
+        self._rendered = deque()  # índices na ordem de renderização
+        self._base = self._render_square() if shape == "square" else None
+
+    def get(self, orientation):
+        """Retorna o sprite mais próximo da orientação (radianos)"""
+        index = int(round(orientation * self.steps / (2*math.pi))) % self.steps
+        sprite = self._sprites[index]
+        if sprite is None:
+            angle = index * 2*math.pi / self.steps
+            if self.shape == "circle":
+                sprite = self._render_circle(angle)
+            else:
+                sprite = pygame.transform.rotate(self._base, -math.degrees(angle))
+            self._sprites[index] = sprite
+            self._rendered.append(index)
+            self.nbytes += sprite.get_pitch() * sprite.get_height()
+            while self.nbytes > self.max_bytes and len(self._rendered) > 1:
+                oldest = self._rendered.popleft()
+                old, self._sprites[oldest] = self._sprites[oldest], None
+                self.nbytes -= old.get_pitch() * old.get_height()
+        return sprite
+
+    def _render_circle(self, orientation):
+        # Versão simplificada e funcional para SSL (círculo com a frente cortada)
+        r = self.radius_px
+        center = r + 2  # margem para a linha de orientação
+        surface = pygame.Surface((center*2, center*2), pygame.SRCALPHA)
+
+        points = []
+        start_angle = -150
+        end_angle = 150
+
+        # Adiciona pontos do arco
+        for angle in range(start_angle, end_angle + 1, 5):
+            rad = math.radians(angle)
+            points.append((center + r * math.cos(rad + orientation + math.pi),
+                           center + r * math.sin(rad + orientation + math.pi)))
+
+        # Adiciona os pontos do segmento reto
+        rad_start = math.radians(start_angle) + orientation + math.pi
+        rad_end = math.radians(end_angle) + orientation + math.pi
+        points.append((center + r * math.cos(rad_end),
+                       center + r * math.sin(rad_end)))
+        points.append((center + r * math.cos(rad_start),
+                       center + r * math.sin(rad_start)))
+
+        pygame.draw.polygon(surface, self.color, points)
+
+        # Linha de orientação
+        pygame.draw.line(surface, BLACK,
+                         (center, center),
+                         (center + r * 0.8 * math.cos(orientation),
+                          center + r * 0.8 * math.sin(orientation)), 2)
+        return surface
+
+    def _render_square(self):
+        # Robô quadrado (VSSS) sem rotação, com a frente apontando para +X
+        r = self.radius_px
+        surface = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
+        pygame.draw.rect(surface, self.color, (0, 0, r*2, r*2))
+        pygame.draw.line(surface, BLACK, (r, r), (r*2, r), 2)
+        return surface
+
+
+class BoundedCache:
+    """Dicionário LRU limitado pela memória dos itens (camadas e atlas de sprites)
+
+    `sizeof(item)` dá os bytes que o item pode ocupar enquanto estiver no
+    cache (para um atlas, o seu limite, não o que já foi renderizado). Os
+    menos usados recentemente são descartados enquanto o total passar de
+    `max_bytes`; o item recém inserido sempre fica.
+    """
+
+    def __init__(self, max_bytes, sizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._items = OrderedDict()  # {chave: (item, bytes)}
+
+    def get(self, key):
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        self._items.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, item):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        size = self.sizeof(item)
+        self._items[key] = (item, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes and len(self._items) > 1:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.nbytes -= evicted
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Caminhos das fontes já resolvidos, lembrados entre execuções (apague para refazer a busca)
+FONT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "visualizador_fontes.json")
+_font_paths = {}
+
+
+def init_pygame():
+    """Inicializa só os módulos usados (vídeo/eventos e fontes), sem áudio nem joystick"""
+    pygame.display.init()
+    pygame.font.init()
+
+
+def resolve_font(name):
+    """Arquivo da fonte do sistema `name`, ou None para a fonte padrão do pygame
+
+    A busca nas fontes do sistema (no Linux roda o fc-list) é feita uma vez
+    e guardada em FONT_CACHE_PATH; as partidas seguintes só leem o arquivo.
+    """
+    key = name.lower()
+    if key in _font_paths:
+        return _font_paths[key]
+    try:
+        with open(FONT_CACHE_PATH) as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        cached = {}
+
+    path = cached.get(key, "")
+    if path == "" or (path is not None and not os.path.exists(path)):
+        path = pygame.font.match_font(name)
+        cached[key] = path
+        try:
+            os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+            with open(FONT_CACHE_PATH, "w") as cache_file:
+                json.dump(cached, cache_file)
+        except OSError:
+            pass
+    _font_paths[key] = path
+    return path
+
+
+def load_font(name, size):
+    """Equivalente a pygame.font.SysFont(name, size), com a busca da fonte em cache"""
+    return pygame.font.Font(resolve_font(name), size)
+
+
+class RenderResources:
+    """Fontes e caches de desenho compartilhados entre visualizadores do mesmo processo
+
+    Atlas de sprites e camadas do campo são indexados por modalidade, escala e
+    geometria, então visualizadores com os mesmos parâmetros usam os mesmos.
+    Os dois caches são limitados em bytes (`layer_budget`, `sprite_budget`).
+    """
+
+    def __init__(self, layer_budget=LAYER_CACHE_BYTES, sprite_budget=SPRITE_CACHE_BYTES):
+        self.font = load_font('Arial', 16)
+        self.big_font = load_font('Arial', 24)
+        self.text_cache = TextCache()
+        self.sprite_atlases = BoundedCache(sprite_budget, lambda atlas: atlas.max_bytes)
+        # Itens: (superfície, goleiras)
+        self.field_layers = BoundedCache(
+            layer_budget, lambda layer: layer[0].get_pitch() * layer[0].get_height())
 
 
 class SoccerVisualizer:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption(
-            "Robotic Soccer Visualizer - ROS2 Integration Ready")
-        self.font = pygame.font.SysFont('Arial', 16)
-        self.big_font = pygame.font.SysFont('Arial', 24)
+    def __init__(self, headless=False, surface=None, resources=None):
+        self._created = time.perf_counter()
+        self.headless = headless
+        if surface is not None:
+            # Desenha numa superfície fornecida (ex.: um ladrilho de uma janela maior)
+            init_pygame()
+            self.screen = surface
+        elif headless:
+            # Sem janela: driver de vídeo dummy e desenho numa superfície fora da tela
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            init_pygame()
+            self.screen = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        else:
+            init_pygame()
+            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT),
+                                                  pygame.RESIZABLE)
+            pygame.display.set_caption(
+                "Robotic Soccer Visualizer - ROS2 Integration Ready")
+
+        self.set_panel_geometry()
+
+        if resources is None:
+            resources = RenderResources()
+        self.resources = resources
+        self.font = resources.font
+        self.big_font = resources.big_font
+        self.text_cache = resources.text_cache
+        self._robot_info_lines = {}  # {(time, robot_id): (valores arredondados, superfície)}
 
         # Dados iniciais
         self.game_mode = GameMode.SSL
-        self.robots = []
-        self.ball = Ball(0, 0)  # Bola no centro do campo (0,0)
+        self.world = WorldState()  # Robôs e bola (bola no centro do campo, 0,0)
+        self.ingest = None  # WorldIngest opcional (ingestao.py)
+        self.estimator = None  # PoseEstimator opcional (interpolacao.py)
+        self.receiver = None  # VisionReceiver opcional (visao_udp.py)
+        self.recorder = None  # LogRecorder opcional (gravacao.py)
+        self.replay = None  # LogReplay opcional (gravacao.py)
+        self.bridge = None  # RosBridge opcional (ponte_ros.py)
+        self.source_clock = SourceClock()  # instantes da fonte -> time.monotonic()
+        self.camera = Camera()  # zoom (roda do mouse) e deslocamento (arrastar)
+        self.fit_scale = 1.0  # escala que mostra o campo inteiro
         self.scale_factor = 1.0
         self.field_offset_x = 50
         self.field_offset_y = 50
         self.robot_paths = {}  # Exemplo: {robot_id: [Pose2D, Pose2D, ...]}
+        self.trails = TrajectoryHistory()  # Trajetórias reais dos últimos 30 s
+        self.show_trails = False
+
+        # Índice espacial dos robôs e o que se calcula com ele (posse, colisões,
+        # cor das goleiras), refeitos só quando o mundo muda
+        self.spatial = None
+        self._spatial_mode = None
+        self._spatial_key = None
+        self._possession = None
+        self._colliding = []
+        self._goal_teams = {}
+        self.show_proximity = True  # posse de bola e colisões (tecla C)
+
+        # Camada estática do campo (refeita só quando a geometria muda); as
+        # goleiras ficam em coordenadas da camada, colada em _layer_pos na tela
+        self._field_layer = None
+        self._layer_tile = None  # recorte da camada (Rect), None se cobre o campo todo
+        self._goal_points = {}
+        self.update_transform()
+
+        # Renderização incremental (retângulos sujos); o painel do campo do
+        # fundo é refeito sozinho quando a vista ou o mapa de calor mudam
+        self._background = None
+        self._background_field = None
+        self._last_frame_state = None
+        self._dirty_rects = []
+        self._panel_lines = []
+
+        # Instrumentação por etapa do frame e overlay no painel
+        self.profiler = FrameProfiler()
+        self.show_profile = False
+        self.profile_path = None  # exporta os percentis ao sair (CSV ou JSON)
+        self._profile_stats = {}
+        self._profile_refreshed = 0.0
+        self._profile_version = 0
+
+        # Caminhos em mm como arrays, por robô: {robot_id: (caminho, array)}
+        self._path_arrays = {}
+
+        # Mapa de calor de ocupação (tecla H alterna azul/amarelo/bola/desligado);
+        # a superfície é refeita no máximo a cada refresh_heatmap_overlay
+        self.heatmap = None
+        self.heatmap_channel = None
+        self._heatmap_colormap = heat_colormap()
+        self._heatmap_surface = None
+        self._heatmap_overlay = None  # (chave da vista, (superfície ampliada, posição))
+        self._heatmap_rendered = None
+        self._heatmap_refreshed = 0.0
+        self._heatmap_version = 0
+        self.reset_heatmap()
 
         # Adiciona alguns robôs de exemplo
         self.add_sample_robots()
         self.generate_paths_for_all_robots()
+        # Escala certa desde o início: o primeiro frame não desenha a camada em 1 px/mm
+        self.calculate_scale_factor()
+        self.profiler.startup['init'] = time.perf_counter() - self._created
+
+    def set_panel_geometry(self):
+        """Divide a superfície de desenho em campo (esquerda) e painel (direita)"""
+        self.width, self.height = self.screen.get_size()
+        self.info_panel_width = min(INFO_PANEL_WIDTH, self.width * 3 // 10)
+        self.field_panel_width = self.width - self.info_panel_width
+        self.field_rect = pygame.Rect(0, 0, self.field_panel_width, self.height)
+
+    def resize(self, surface):
+        """Passa a desenhar em `surface` (janela redimensionada ou novo ladrilho)"""
+        self.screen = surface
+        self.set_panel_geometry()
+        self._last_frame_state = None
+        self._dirty_rects = []
+        self._panel_lines = []
+        self.calculate_scale_factor()
 
     def generate_random_path(self, start_x, start_y, num_points=5, step=300):
         path = []
         x, y = start_x, start_y
-        path.append(type('Pose2D', (), {'x': x, 'y': y, 'theta': 0})())
+        path.append(Pose2D(x, y, 0))
         
-        bounds = MODALITY_PARAMS[self.game_mode]["field_bounds"]
+        bounds = self.geometry.bounds
         
         for _ in range(num_points):
             x += random.randint(-step, step)
@@ -104,7 +708,7 @@ class SoccerVisualizer:
             x = max(bounds["x_min"], min(bounds["x_max"], x))
             y = max(bounds["y_min"], min(bounds["y_max"], y))
             
-            path.append(type('Pose2D', (), {'x': x, 'y': y, 'theta': 0})())
+            path.append(Pose2D(x, y, 0))
         return path
 
     def generate_paths_for_all_robots(self):
@@ -113,395 +717,1099 @@ class SoccerVisualizer:
 
     def add_sample_robots(self):
         """Adiciona robôs de exemplo para demonstração usando coordenadas centradas"""
-        bounds = MODALITY_PARAMS[self.game_mode]["field_bounds"]
+        bounds = self.geometry.bounds
 
         # Robôs azuis (lado esquerdo)
         for i in range(3):
-            self.robots.append(Robot(
+            self.world.set_robot(
                 i,
                 bounds["x_min"] + abs(bounds["x_min"]) * 0.3,  # 30% da distância do lado esquerdo
                 bounds["y_min"] + (bounds["y_max"] - bounds["y_min"]) * (0.25 + i*0.25),
                 0, 'blue'
-            ))
+            )
 
         # Robôs amarelos (lado direito)
         for i in range(3):
-            self.robots.append(Robot(
+            self.world.set_robot(
                 i+3,
                 bounds["x_max"] - abs(bounds["x_max"]) * 0.3,  # 30% da distância do lado direito
                 bounds["y_min"] + (bounds["y_max"] - bounds["y_min"]) * (0.25 + i*0.25),
                 math.pi, 'yellow'
-            ))
+            )
 
         # Bola no centro (0,0)
-        self.ball = Ball(0, 0)
+        self.world.set_ball(0, 0)
+
+    @property
+    def geometry(self):
+        """Geometria pré-calculada da modalidade atual"""
+        return MODALITY_GEOMETRY[self.game_mode]
+
+    @property
+    def render_world(self):
+        """Estado usado no desenho: o estimado se a interpolação estiver ligada"""
+        if self.estimator is not None:
+            return self._estimated_world
+        return self.world
+
+    def enable_interpolation(self, delay=0.0, max_extrapolation=0.1):
+        """Desenha poses interpoladas/extrapoladas a partir do histórico da visão"""
+        self.estimator = PoseEstimator(delay=delay, max_extrapolation=max_extrapolation)
+        self._estimated_world = WorldState()
+        self.estimator.observe(self.world, time.monotonic())
+
+    def update_estimate(self, now=None):
+        """Recalcula as poses estimadas para o instante de desenho"""
+        if self.estimator is not None:
+            if now is None:
+                now = time.monotonic()
+            self.estimator.estimate(self.world, now, self._estimated_world)
+
+    @property
+    def robots(self):
+        """Robôs ativos como visões Robot (compatibilidade)
+
+        É uma tupla: para trocar os robôs, atribua uma nova sequência
+        (`visualizer.robots = [...]`), que é copiada para o WorldState.
+        """
+        return self.world.robots()
+
+    @robots.setter
+    def robots(self, robots):
+        # Lê os valores antes de limpar: `robots` pode conter visões deste mesmo mundo
+        rows = [(robot.id, robot.x, robot.y, robot.orientation, robot.team) for robot in robots]
+        self.world.clear()
+        for row in rows:
+            self.world.set_robot(*row)
+
+    @property
+    def ball(self):
+        """Bola como visão Ball (compatibilidade)"""
+        return self.world.ball
+
+    @ball.setter
+    def ball(self, ball):
+        self.world.set_ball(ball.x, ball.y)
 
     def update_robots(self, robot_data):
         """Atualiza os robôs com dados recebidos da visão"""
-        self.robots = []
-        for data in robot_data:
-            self.robots.append(Robot(
-                data.id,
-                data.x_mm,  # Posição X em mm (já centrada)
-                data.y_mm,  # Posição Y em mm (já centrada)
-                data.orientation_rad,  # Orientação em radianos
-                data.team  # 'blue' ou 'yellow'
-            ))
+        self.world.update_robots(
+            (data.id,
+             data.x_mm,  # Posição X em mm (já centrada)
+             data.y_mm,  # Posição Y em mm (já centrada)
+             data.orientation_rad,  # Orientação em radianos
+             data.team)  # 'blue' ou 'yellow'
+            for data in robot_data)
+        self.world_updated()
+
+    def attach_ingest(self, ingest):
+        """Usa um WorldIngest (já iniciado) como fonte de dados do loop principal"""
+        self.ingest = ingest
+        self.source_clock.reset()
+
+    def attach_receiver(self, receiver):
+        """Usa um VisionReceiver como fonte; os robôs de exemplo são descartados"""
+        self.receiver = receiver
+        self.source_clock.reset()
+        self.world.clear()
+        self.robot_paths.clear()
+
+    def attach_bridge(self, bridge):
+        """Usa uma RosBridge como fonte; robôs e caminhos de exemplo são descartados
+
+        Os caminhos passam a vir só das mensagens do planejador.
+        """
+        self.bridge = bridge
+        self.source_clock.reset()
+        self.world.clear()
+        self.robot_paths.clear()
+
+    def attach_recorder(self, recorder):
+        """Grava cada snapshot recebido num LogRecorder"""
+        self.recorder = recorder
+
+    def attach_replay(self, replay):
+        """Usa um LogReplay como fonte; os robôs de exemplo são descartados"""
+        self.replay = replay
+        self.world.clear()
+        self.robot_paths.clear()
+
+    def world_updated(self, t=None):
+        """Chamado a cada nova amostra da fonte: grava e alimenta o estimador e o mapa
+
+        `t` é o instante da amostra no relógio da fonte (timestamp do
+        WorldPacket, t_capture da visão, stamp do ROS), levado para o relógio
+        monotônico local; sem ele, vale o instante de chegada.
+        """
+        if self.recorder is not None:
+            self.recorder.record(self.world)
+        t = time.monotonic() if t is None else self.source_clock.to_local(t)
+        if self.estimator is not None:
+            self.estimator.observe(self.world, t)
+        self.heatmap.observe(self.world, t)
+
+    def apply_packet(self, packet):
+        """Aplica um WorldPacket ao estado do mundo"""
+        self.world.update_robots(packet.robots)
+        if packet.ball is not None:
+            self.world.set_ball(*packet.ball)
+        self.world_updated(packet.timestamp)
+
+    def handle_replay_key(self, key):
+        """Controles da reprodução: espaço pausa, +/- velocidade, setas passo/busca"""
+        replay = self.replay
+        if key == pygame.K_SPACE:
+            replay.paused = not replay.paused
+        elif key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            replay.set_speed(replay.speed * 2)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            replay.set_speed(replay.speed / 2)
+        elif key == pygame.K_RIGHT:
+            if replay.paused:
+                replay.step(1)
+            else:
+                replay.seek(replay.position + 5)
+        elif key == pygame.K_LEFT:
+            if replay.paused:
+                replay.step(-1)
+            else:
+                replay.seek(replay.position - 5)
+        elif key == pygame.K_HOME:
+            replay.seek(replay.start_time)
 
     def update_game_mode(self, new_mode):
         """Altera a modalidade do jogo"""
         self.game_mode = new_mode
-        self.robots = []
-        self.add_sample_robots()
+        self.invalidate_field_cache()
+        self.world.clear()
+        self.trails.clear()
+        self.reset_heatmap()
+        if not self.has_source():
+            # Robôs de exemplo só na demonstração: as fontes nunca removeriam esses robôs
+            self.add_sample_robots()
+        self.camera.reset()
         self.calculate_scale_factor()
 
+    def has_source(self):
+        """Se há uma fonte de dados ligada (replay, visão, ROS2 ou ingestão)"""
+        return any(source is not None for source in
+                   (self.replay, self.receiver, self.bridge, self.ingest))
+
     def calculate_scale_factor(self):
         """Calcula o fator de escala para desenhar o campo na tela"""
-        params = MODALITY_PARAMS[self.game_mode]
-        field_w, field_h = params["field_size"]
+        geometry = self.geometry
 
         # Calcula o maior fator de escala que cabe no painel do campo
-        scale_w = (FIELD_PANEL_WIDTH - 2*self.field_offset_x) / field_w
-        scale_h = (WINDOW_HEIGHT - 2*self.field_offset_y) / field_h
-        self.scale_factor = min(scale_w, scale_h)
+        scale_w = (self.field_panel_width - 2*self.field_offset_x) / geometry.field_w
+        scale_h = (self.height - 2*self.field_offset_y) / geometry.field_h
+        self.fit_scale = min(scale_w, scale_h)
+        self.scale_factor = self.fit_scale * self.camera.zoom
+        self.update_transform()
+        self.invalidate_field_cache()
+
+    def update_transform(self):
+        """Pré-calcula os termos da transformação afim mm -> pixels"""
+        geometry = self.geometry
+        field_w, field_h = geometry.field_w, geometry.field_h
+
+        # Pixel do centro da vista: onde fica o centro do campo sem zoom
+        anchor_px = np.array([
+            self.field_offset_x + field_w/2 * self.fit_scale,
+            self.field_offset_y + field_h/2 * self.fit_scale
+        ])
+        # Pixel correspondente à origem (0,0) no centro do campo
+        self._origin_px = anchor_px - self.camera.center * self.scale_factor
+
+        # Posição da camada do campo (a origem dela fica sobre _origin_px)
+        margin = self.layer_margin()
+        layer_origin = (margin + field_w/2 * self.scale_factor,
+                        margin + field_h/2 * self.scale_factor)
+        self._layer_pos = tuple(np.round(self._origin_px - layer_origin).astype(int).tolist())
+
+        # Com a camada recortada, a vista que sai do recorte pede um recorte novo
+        if self._layer_tile is not None and not self._layer_tile.contains(self.layer_view()):
+            self._field_layer = None
+
+    def px_to_mm(self, px_x, px_y):
+        """Converte um pixel da tela para mm (inversa de mm_to_px)"""
+        origin_x, origin_y = self._origin_px
+        return ((px_x - origin_x) / self.scale_factor,
+                (px_y - origin_y) / self.scale_factor)
+
+    def zoom_camera(self, steps, pos_px):
+        """Aproxima (steps > 0) ou afasta a vista mantendo o ponto sob `pos_px`"""
+        if self.camera.zoom_at(steps, self.px_to_mm(*pos_px), self.geometry.bounds):
+            self.calculate_scale_factor()
+
+    def pan_camera(self, dx_px, dy_px):
+        """Arrasta a vista em pixels (o campo acompanha o mouse)"""
+        self.camera.pan(-dx_px / self.scale_factor, -dy_px / self.scale_factor,
+                        self.geometry.bounds)
+        self.update_transform()
+
+    def reset_camera(self):
+        self.camera.reset()
+        self.calculate_scale_factor()
 
     def mm_to_px(self, mm_x, mm_y):
         """Converte coordenadas em mm (centradas) para pixels na tela"""
-        params = MODALITY_PARAMS[self.game_mode]
-        field_w, field_h = params["field_size"]
-        
-        # Converte de coordenadas centradas para coordenadas com origem no canto
-        field_coord_x = mm_x + field_w/2
-        field_coord_y = mm_y + field_h/2
-        
-        # Converte para pixels
-        px_x = self.field_offset_x + field_coord_x * self.scale_factor
-        px_y = self.field_offset_y + field_coord_y * self.scale_factor
-        return px_x, px_y
-
-    def draw_field(self):
-        """Desenha o campo com goleiras dinâmicas usando coordenadas centradas"""
-        params = MODALITY_PARAMS[self.game_mode]
-        bounds = params["field_bounds"]
-        field_w, field_h = params["field_size"]
-        goal_w, goal_d, _ = params["goal_size"]
+        origin_x, origin_y = self._origin_px
+        return (float(origin_x + mm_x * self.scale_factor),
+                float(origin_y + mm_y * self.scale_factor))
+
+    def mm_to_px_array(self, points_mm):
+        """Converte um array (N,2) de coordenadas em mm para pixels de uma só vez"""
+        return np.asarray(points_mm, dtype=float) * self.scale_factor + self._origin_px
+
+    def invalidate_field_cache(self):
+        """Descarta a camada estática do campo (chamado quando a geometria muda)"""
+        self._field_layer = None
+        self._background = None
+
+    def build_field_layer(self):
+        """Pré-renderiza a geometria estática do campo numa superfície própria
+
+        A camada cobre o campo inteiro com uma margem, numa escala (nível de
+        zoom) fixa; o deslocamento da câmera só muda onde ela é colada. Com
+        zoom alto, só o recorte de `layer_tile` é renderizado. Fica no cache
+        compartilhado (RenderResources), indexada pela modalidade, escala,
+        margem e recorte, então voltar a um nível de zoom não a redesenha.
+        """
+        margin = self.layer_margin()
+        tile = self.layer_tile()
+        key = (self.game_mode, self.scale_factor, margin, None if tile is None else tuple(tile))
+        cached = self.resources.field_layers.get(key)
+        if cached is None:
+            cached = self.render_field_layer(margin, tile)
+            self.resources.field_layers.put(key, cached)
+        self._field_layer, self._goal_points = cached
+        self._layer_tile = tile
+
+    def layer_size(self):
+        """Tamanho em pixels da camada do campo inteiro na escala atual"""
+        geometry = self.geometry
+        margin = self.layer_margin()
+        return (int(math.ceil(geometry.field_w * self.scale_factor)) + 2*margin,
+                int(math.ceil(geometry.field_h * self.scale_factor)) + 2*margin)
+
+    def layer_view(self):
+        """Painel do campo em pixels da camada inteira"""
+        return self.field_rect.move(-self._layer_pos[0], -self._layer_pos[1])
+
+    def layer_tile(self):
+        """Recorte da camada a renderizar (Rect em pixels da camada inteira), ou None
+
+        O recorte é alinhado a múltiplos da sua margem, então recortes vizinhos
+        se repetem ao ir e voltar e são reaproveitados do cache.
+        """
+        width, height = self.layer_size()
+        view = self.layer_view()
+        if width * height <= LAYER_TILE_FACTOR * view.width * view.height:
+            return None
+        step_x = max(int(view.width * TILE_MARGIN), 1)
+        step_y = max(int(view.height * TILE_MARGIN), 1)
+        return pygame.Rect(view.x // step_x * step_x - step_x, view.y // step_y * step_y - step_y,
+                           view.width + 2*step_x, view.height + 2*step_y)
+
+    def layer_blit_pos(self):
+        """Posição na tela da superfície da camada (inteira ou recortada)"""
+        if self._layer_tile is None:
+            return self._layer_pos
+        return (self._layer_pos[0] + self._layer_tile.x, self._layer_pos[1] + self._layer_tile.y)
+
+    def layer_margin(self):
+        """Margem da camada do campo: a do painel, ou mais se as goleiras não couberem"""
+        return max(self.field_offset_x, self.field_offset_y,
+                   int(math.ceil(self.geometry.goal_d * self.scale_factor)) + 2)
+
+    def render_field_layer(self, margin, tile=None):
+        """Desenha a camada do campo, inteira ou só o recorte `tile`
+
+        Retorna (superfície, goleiras em pixels da camada inteira).
+        """
+        geometry = self.geometry
+        scale = self.scale_factor
+        tile_x, tile_y = (0, 0) if tile is None else tile.topleft
+
+        # Pixel da superfície correspondente à origem (0,0) no centro do campo
+        origin = (margin + geometry.field_w/2 * scale - tile_x,
+                  margin + geometry.field_h/2 * scale - tile_y)
+        surface = pygame.Surface(self.layer_size() if tile is None else tile.size)
+        surface.fill(BLACK)
+
+        def to_px(mm_x, mm_y):
+            return (origin[0] + mm_x * scale, origin[1] + mm_y * scale)
 
         # Conversão para pixels
-        field_px_w = field_w * self.scale_factor
-        field_px_h = field_h * self.scale_factor
-        field_px_x, field_px_y = self.mm_to_px(bounds["x_min"], bounds["y_min"])
-        goal_px_w = goal_w * self.scale_factor
-        goal_px_d = goal_d * self.scale_factor
+        field_px_w = geometry.field_w * scale
+        field_px_h = geometry.field_h * scale
+        field_px_x, field_px_y = to_px(geometry.x_min, geometry.y_min)
 
         # Campo principal
-        pygame.draw.rect(self.screen, GREEN,
+        pygame.draw.rect(surface, GREEN,
                          (field_px_x, field_px_y, field_px_w, field_px_h))
 
         # Linhas brancas
-        pygame.draw.rect(self.screen, WHITE,
+        pygame.draw.rect(surface, WHITE,
                          (field_px_x, field_px_y, field_px_w, field_px_h), 2)
 
         # Linha central (x=0)
-        center_x, _ = self.mm_to_px(0, 0)
-        pygame.draw.line(self.screen, WHITE,
+        center_x, center_y = to_px(0, 0)
+        pygame.draw.line(surface, WHITE,
                          (center_x, field_px_y),
                          (center_x, field_px_y + field_px_h), 2)
 
         # Círculo central (centro em 0,0)
-        center_circle_diameter = params["center_circle_size"]
-        center_circle_radius_px = (center_circle_diameter / 2) * self.scale_factor
-        center_px_x, center_px_y = self.mm_to_px(0, 0)
-        pygame.draw.circle(self.screen, WHITE,
-                           (center_px_x, center_px_y),
-                           center_circle_radius_px, 1)
+        pygame.draw.circle(surface, WHITE, (center_x, center_y),
+                           geometry.center_circle_radius * scale, 1)
 
         # Áreas do goleiro
-        goal_area_w, goal_area_h = params["goalkeeper_area_size"]
-        goal_area_px_w = goal_area_w * self.scale_factor
-        goal_area_px_h = goal_area_h * self.scale_factor
+        goal_area_px_w = geometry.goal_area_w * scale
+        goal_area_px_h = geometry.goal_area_h * scale
 
         # Área do goleiro esquerda
-        left_goal_area_x, left_goal_area_y = self.mm_to_px(bounds["x_min"], -goal_area_h/2)
-        pygame.draw.rect(self.screen, WHITE,
+        left_goal_area_x, left_goal_area_y = to_px(geometry.x_min, -geometry.goal_area_h/2)
+        pygame.draw.rect(surface, WHITE,
                          (left_goal_area_x, left_goal_area_y,
                           goal_area_px_w, goal_area_px_h), 1)
 
         # Área do goleiro direita
-        right_goal_area_x, right_goal_area_y = self.mm_to_px(bounds["x_max"] - goal_area_w, -goal_area_h/2)
-        pygame.draw.rect(self.screen, WHITE,
+        right_goal_area_x, right_goal_area_y = to_px(geometry.x_max - geometry.goal_area_w,
+                                                     -geometry.goal_area_h/2)
+        pygame.draw.rect(surface, WHITE,
                          (right_goal_area_x, right_goal_area_y,
                           goal_area_px_w, goal_area_px_h), 1)
 
-        # Elementos específicos do VSSS
-        if self.game_mode == GameMode.VSSS:
-            # Marcas em '+' (cruzamentos)
-            cross_size = 20 * self.scale_factor
-            cross_positions = [
-                (-bounds["x_max"]/2, 0),           # Centro esquerdo
-                (bounds["x_max"]/2, 0),            # Centro direito
-                (-bounds["x_max"]/2, bounds["y_max"]/2.6),     # Centro superior esquerdo
-                (bounds["x_max"]/2, bounds["y_max"]/2.6),      # Centro superior direito
-                (-bounds["x_max"]/2, -bounds["y_max"]/2.6),    # Centro inferior esquerdo
-                (bounds["x_max"]/2, -bounds["y_max"]/2.6),     # Centro inferior direito
-            ]
-
-            for pos_x, pos_y in cross_positions:
-                px_x, px_y = self.mm_to_px(pos_x, pos_y)
-                # Linha horizontal
-                pygame.draw.line(self.screen, WHITE,
-                                 (px_x - cross_size, px_y),
-                                 (px_x + cross_size, px_y), 2)
-                # Linha vertical
-                pygame.draw.line(self.screen, WHITE,
-                                 (px_x, px_y - cross_size),
-                                 (px_x, px_y + cross_size), 2)
-
-            # Cantos chanfrados (diagonais)
-            corner_size = 70 * self.scale_factor
-            corner_offset = 70  # Distância do canto em mm
-            
-            corners = [
-                (bounds["x_min"] + corner_offset, bounds["y_max"] - corner_offset, 1, -1),     # Superior esquerdo
-                (bounds["x_max"] - corner_offset, bounds["y_max"] - corner_offset, -1, -1),    # Superior direito
-                (bounds["x_min"] + corner_offset, bounds["y_min"] + corner_offset, 1, 1),      # Inferior esquerdo
-                (bounds["x_max"] - corner_offset, bounds["y_min"] + corner_offset, -1, 1)      # Inferior direito
-            ]
-
-            for corner_x, corner_y, dir_x, dir_y in corners:
-                start_x, start_y = self.mm_to_px(corner_x, corner_y)
-                end_x = start_x + corner_size * dir_x
-                end_y = start_y + corner_size * dir_y
-                pygame.draw.line(self.screen, WHITE,
-                                 (start_x, start_y),
-                                 (end_x, end_y), 2)
+        # Elementos específicos do VSSS: marcas em '+'
+        cross_size = geometry.cross_size * scale
+        for pos_x, pos_y in geometry.cross_marks:
+            px_x, px_y = to_px(pos_x, pos_y)
+            # Linha horizontal
+            pygame.draw.line(surface, WHITE,
+                             (px_x - cross_size, px_y),
+                             (px_x + cross_size, px_y), 2)
+            # Linha vertical
+            pygame.draw.line(surface, WHITE,
+                             (px_x, px_y - cross_size),
+                             (px_x, px_y + cross_size), 2)
+
+        # ... e cantos chanfrados (diagonais)
+        corner_size = geometry.corner_size * scale
+        for corner_x, corner_y, dir_x, dir_y in geometry.corner_marks:
+            start_x, start_y = to_px(corner_x, corner_y)
+            end_x = start_x + corner_size * dir_x
+            end_y = start_y + corner_size * dir_y
+            pygame.draw.line(surface, WHITE,
+                             (start_x, start_y),
+                             (end_x, end_y), 2)
+
+        # Goleiras (fundo verde estático, a borda é desenhada a cada frame)
+        goal_points = {side: [to_px(x, y) for x, y in polygon]
+                       for side, polygon in geometry.goal_polygons.items()}
+        for points in goal_points.values():
+            pygame.draw.polygon(surface, GREEN, points)
+        goal_points = {side: [(x + tile_x, y + tile_y) for x, y in points]
+                       for side, points in goal_points.items()}
+        return surface, goal_points
 
+    def draw_field(self):
+        """Desenha o campo com goleiras dinâmicas usando coordenadas centradas"""
+        self.draw_field_background(self.screen)
+        return self.draw_goals()
+
+    def reset_heatmap(self):
+        """Zera o mapa de calor com a grade da modalidade atual (células de um raio de robô)"""
+        geometry = self.geometry
+        self.heatmap = OccupancyHeatmap(geometry.bounds, geometry.robot_radius,
+                                        window=HEATMAP_WINDOW)
+        self._heatmap_rendered = None
+
+    def field_surface(self):
+        """Camada do campo na escala atual (renderizada na primeira vez que é pedida)"""
+        if self._field_layer is None:
+            self.build_field_layer()
+        return self._field_layer
+
+    def heatmap_overlay(self):
+        """(superfície, posição na tela) do mapa de calor visível no painel, ou None
+
+        Só as células que aparecem no painel do campo são ampliadas, então o
+        custo acompanha a área da vista, qualquer que seja o zoom. A ampliação
+        é refeita quando o mapa é recolorido ou a vista muda.
+        """
+        surface = self._heatmap_surface
+        if surface is None:
+            return None
+        key = (surface, self.scale_factor, tuple(self._origin_px), tuple(self.field_rect))
+        if self._heatmap_overlay is not None and self._heatmap_overlay[0] == key:
+            return self._heatmap_overlay[1]
+
+        heatmap = self.heatmap
+        cell_px = heatmap.cell_size * self.scale_factor
+        left, top = self.mm_to_px(heatmap.x_min, heatmap.y_min)
+        view = self.field_rect
+        # Células (colunas x0..x1, linhas y0..y1) que cruzam o painel do campo
+        x0 = max(int((view.left - left) // cell_px), 0)
+        y0 = max(int((view.top - top) // cell_px), 0)
+        x1 = min(int(math.ceil((view.right - left) / cell_px)), heatmap.nx)
+        y1 = min(int(math.ceil((view.bottom - top) / cell_px)), heatmap.ny)
+        overlay = None
+        if x0 < x1 and y0 < y1:
+            px0, py0 = round(left + x0 * cell_px), round(top + y0 * cell_px)
+            size = (max(round(left + x1 * cell_px) - px0, 1),
+                    max(round(top + y1 * cell_px) - py0, 1))
+            cells = surface.subsurface((x0, y0, x1 - x0, y1 - y0))
+            overlay = (pygame.transform.scale(cells, size), (px0, py0))
+        self._heatmap_overlay = (key, overlay)
+        return overlay
+
+    def draw_field_background(self, target):
+        """Desenha camada do campo e mapa de calor em `target`, recortados no painel do campo"""
+        clip = target.get_clip()
+        target.set_clip(self.field_rect)
+        target.fill(BLACK)
+        target.blit(self.field_surface(), self.layer_blit_pos())
+        overlay = self.heatmap_overlay()
+        if overlay is not None:
+            target.blit(*overlay)
+        target.set_clip(clip)
+
+    def update_spatial_index(self):
+        """Reindexa os robôs e recalcula posse, colisões e goleiras se o mundo mudou
+
+        Vários desenhos do mesmo estado do mundo custam só a comparação das
+        posições com as da última atualização.
+        """
+        world = self.render_world
+        n = world.count
+        key = (self.game_mode, world.xy[:n].tobytes(), world.team[:n].tobytes(),
+               world.ball_xy.tobytes())
+        if key == self._spatial_key:
+            return
+        self._spatial_key = key
+
+        geometry = self.geometry
+        if self.spatial is None or self._spatial_mode != self.game_mode:
+            self.spatial = SpatialGrid(geometry.bounds, geometry.collision_distance)
+            self._spatial_mode = self.game_mode
+        self.spatial.rebuild(world.xy[:n])
+
+        nearest = self.spatial.nearest(*world.ball_xy.tolist())
+        self._possession = None
+        if nearest is not None and nearest[1] <= geometry.possession_distance:
+            self._possession = nearest[0]
+
+        pairs = self.spatial.pairs_within(geometry.collision_distance)
+        self._colliding = np.unique(pairs).tolist()
+
+        # Time do robô mais próximo do centro de cada goleira (None sem robôs)
+        for side, goal_center_x in (('left', geometry.x_min), ('right', geometry.x_max)):
+            nearest = self.spatial.nearest(goal_center_x, 0)
+            self._goal_teams[side] = None if nearest is None else int(world.team[nearest[0]])
+
+    def ball_possession(self):
+        """Índice do robô com a bola (mais próximo e encostado nela), ou None"""
+        self.update_spatial_index()
+        return self._possession
+
+    def colliding_robots(self):
+        """Índices dos robôs sobrepostos a algum outro, em ordem"""
+        self.update_spatial_index()
+        return self._colliding
+
+    def draw_proximity(self, positions_px):
+        """Anel branco no robô com a bola e vermelho nos robôs em colisão"""
+        ring_px = self.geometry.robot_radius * self.scale_factor + 4
+        rects = []
+        for index in self.colliding_robots():
+            rects.append(pygame.draw.circle(self.screen, RED, positions_px[index], ring_px, 2))
+        possession = self.ball_possession()
+        if possession is not None:
+            rects.append(pygame.draw.circle(self.screen, WHITE, positions_px[possession],
+                                            ring_px + 3, 2))
+        return rects
+
+    def draw_goals(self):
+        """Desenha as bordas das goleiras na cor do time mais próximo; retorna os retângulos"""
         # Goleiras dinâmicas
+        self.update_spatial_index()
+
+        rects = []
         for side in ['left', 'right']:
-            # Determina a cor da borda baseada nos robôs mais próximos
+            # Determina a cor da borda baseada no robô mais próximo do centro da goleira
             border_color = WHITE
-            min_dist = float('inf')
-
-            for robot in self.robots:
-                # Calcula distância ao centro da goleira
-                goal_center_x = bounds["x_min"] if side == 'left' else bounds["x_max"]
-                dist = math.sqrt((robot.x - goal_center_x)**2 + (robot.y - 0)**2)
-
-                if dist < min_dist:
-                    min_dist = dist
-                    border_color = BLUE if robot.team == 'blue' else YELLOW
-
-            # Pontos da goleira
-            if side == 'left':
-                goal_left_x, goal_top_y = self.mm_to_px(bounds["x_min"], -goal_w/2)
-                goal_left_ext_x, _ = self.mm_to_px(bounds["x_min"] - goal_d, -goal_w/2)
-                _, goal_bottom_y = self.mm_to_px(bounds["x_min"], goal_w/2)
-                
-                goal_points = [
-                    (goal_left_x, goal_top_y),
-                    (goal_left_ext_x, goal_top_y),
-                    (goal_left_ext_x, goal_bottom_y),
-                    (goal_left_x, goal_bottom_y)
-                ]
-            else:
-                goal_right_x, goal_top_y = self.mm_to_px(bounds["x_max"], -goal_w/2)
-                goal_right_ext_x, _ = self.mm_to_px(bounds["x_max"] + goal_d, -goal_w/2)
-                _, goal_bottom_y = self.mm_to_px(bounds["x_max"], goal_w/2)
-                
-                goal_points = [
-                    (goal_right_x, goal_top_y),
-                    (goal_right_ext_x, goal_top_y),
-                    (goal_right_ext_x, goal_bottom_y),
-                    (goal_right_x, goal_bottom_y)
-                ]
-
-            # Desenha goleira (verde com borda colorida)
-            pygame.draw.polygon(self.screen, GREEN, goal_points)
-            pygame.draw.polygon(self.screen, border_color, goal_points, 2)
-
-    def draw_robot(self, robot):
+            team = self._goal_teams[side]
+            if team is not None:
+                border_color = BLUE if team == 0 else YELLOW
+
+            layer_x, layer_y = self._layer_pos
+            points = [(x + layer_x, y + layer_y) for x, y in self._goal_points[side]]
+            rects.append(pygame.draw.polygon(self.screen, border_color, points, 2))
+        return rects
+
+    def sprite_atlas(self, team):
+        """Atlas de sprites para (modalidade, time, escala) atuais"""
+        key = (self.game_mode, team, self.scale_factor)
+        atlas = self.resources.sprite_atlases.get(key)
+        if atlas is None:
+            geometry = self.geometry
+            atlas = RobotSpriteAtlas(
+                geometry.robot_shape,
+                BLUE if team == 'blue' else YELLOW,
+                int(geometry.robot_radius * self.scale_factor),
+                max_bytes=self.resources.sprite_atlases.max_bytes // ATLASES_PER_CACHE)
+            self.resources.sprite_atlases.put(key, atlas)
+        return atlas
+
+    def draw_robot(self, robot, pos_px=None):
         """Desenha um robô de acordo com a modalidade atual"""
-        params = MODALITY_PARAMS[self.game_mode]
-        robot_px_x, robot_px_y = self.mm_to_px(robot.x, robot.y)
-        robot_px_radius = int(params["robot_radius"] * self.scale_factor)
-
-        color = BLUE if robot.team == 'blue' else YELLOW
-
-        if params["robot_shape"] == "circle":
-            # Versão simplificada e funcional para SSL
-            points = []
-            start_angle = -150
-            end_angle = 150
-
-            # Adiciona pontos do arco
-            for angle in range(start_angle, end_angle + 1, 5):
-                rad = math.radians(angle)
-                x = robot_px_x + robot_px_radius * \
-                    math.cos(rad + robot.orientation + math.pi)
-                y = robot_px_y + robot_px_radius * \
-                    math.sin(rad + robot.orientation + math.pi)
-                points.append((x, y))
-
-            # Adiciona os pontos do segmento reto
-            rad_start = math.radians(start_angle) + robot.orientation + math.pi
-            rad_end = math.radians(end_angle) + robot.orientation + math.pi
-            points.append((
-                robot_px_x + robot_px_radius * math.cos(rad_end),
-                robot_px_y + robot_px_radius * math.sin(rad_end)
-            ))
-            points.append((
-                robot_px_x + robot_px_radius * math.cos(rad_start),
-                robot_px_y + robot_px_radius * math.sin(rad_start)
-            ))
-
-            # Desenha o polígono
-            pygame.draw.polygon(self.screen, color, points)
-
-            # Linha de orientação
-            end_x = robot_px_x + robot_px_radius * \
-                0.8 * math.cos(robot.orientation)
-            end_y = robot_px_y + robot_px_radius * \
-                0.8 * math.sin(robot.orientation)
-            pygame.draw.line(self.screen, BLACK,
-                             (robot_px_x, robot_px_y),
-                             (end_x, end_y), 2)
-        else:
-            # Robô quadrado (VSSS)
-            robot_surface = pygame.Surface((robot_px_radius*2, robot_px_radius*2),
-                                           pygame.SRCALPHA)
-
-            # Desenha o quadrado (centrado)
-            pygame.draw.rect(robot_surface, color,
-                             (0, 0, robot_px_radius*2, robot_px_radius*2))
-
-            # Desenha a linha de orientação
-            front_center = (robot_px_radius*2, robot_px_radius)
-            pygame.draw.line(robot_surface, BLACK,
-                             (robot_px_radius, robot_px_radius),
-                             front_center, 2)
-
-            # Rotaciona o robô
-            rotated = pygame.transform.rotate(
-                robot_surface, -math.degrees(robot.orientation))
-            rot_rect = rotated.get_rect(center=(robot_px_x, robot_px_y))
-            self.screen.blit(rotated, rot_rect)
+        if pos_px is None:
+            pos_px = self.mm_to_px(robot.x, robot.y)
+        self.blit_robot(robot.id, robot.team, robot.orientation, pos_px)
+
+    def blit_robot(self, robot_id, team, orientation, pos_px):
+        """Desenha um robô a partir dos valores crus (sprite + ID)"""
+        sprite = self.sprite_atlas(team).get(orientation)
+        rect = self.screen.blit(sprite, sprite.get_rect(center=pos_px))
 
         # ID do robô
-        text = self.font.render(str(robot.id), True, BLACK)
-        text_rect = text.get_rect(center=(robot_px_x, robot_px_y))
-        self.screen.blit(text, text_rect)
+        text = self.text_cache.render(self.font, str(robot_id), BLACK)
+        text_rect = text.get_rect(center=pos_px)
+        return rect.union(self.screen.blit(text, text_rect))
 
-    def draw_robot_path(self, robot_id):
+    def path_mm_array(self, robot_id):
+        """Array (N,2) em mm do caminho de um robô, refeito só quando o caminho muda"""
         path = self.robot_paths.get(robot_id, [])
-        if len(path) < 2:
-            return
-
-        # Converte os pontos do caminho para pixels
-        points_px = [self.mm_to_px(pose.x, pose.y) for pose in path]
+        cached = self._path_arrays.get(robot_id)
+        if cached is not None and cached[0] is path and len(cached[1]) == len(path):
+            return cached[1]
+
+        points_mm = np.array([(pose.x, pose.y) for pose in path],
+                             dtype=float).reshape(-1, 2)
+        self._path_arrays[robot_id] = (path, points_mm)
+        return points_mm
+
+    def in_view(self, points_px, margin):
+        """Máscara dos pontos (N,2) em pixels a até `margin` px do painel do campo"""
+        points_px = np.asarray(points_px).reshape(-1, 2)
+        return ((points_px[:, 0] >= -margin) & (points_px[:, 0] <= self.field_panel_width + margin)
+                & (points_px[:, 1] >= -margin) & (points_px[:, 1] <= self.height + margin))
+
+    def polyline_in_view(self, points_px, margin):
+        """Se a caixa envolvente da polilinha alcança o painel do campo"""
+        low = points_px.min(axis=0)
+        high = points_px.max(axis=0)
+        return (high[0] >= -margin and low[0] <= self.field_panel_width + margin
+                and high[1] >= -margin and low[1] <= self.height + margin)
+
+    def draw_robot_path(self, robot_id, points_px=None):
+        if points_px is None:
+            # Converte os pontos do caminho para pixels
+            points_px = self.mm_to_px_array(self.path_mm_array(robot_id))
+        if len(points_px) < 2 or not self.polyline_in_view(points_px, 6):
+            return None
 
         # Desenha a polyline
-        pygame.draw.lines(self.screen, ORANGE, False, points_px, 2)
+        rect = pygame.draw.lines(self.screen, ORANGE, False, points_px, 2)
 
-        # Desenha pequenos círculos nos pontos
-        for pt in points_px:
+        # Desenha pequenos círculos nos pontos visíveis
+        for pt in points_px[self.in_view(points_px, 6)]:
             pygame.draw.circle(self.screen, ORANGE, pt, 5)
-
-    def draw_ball(self):
+        return rect.inflate(12, 12)
+
+    def draw_trails(self):
+        """Desenha as trajetórias simplificadas com tolerância de TRAIL_TOLERANCE_PX"""
+        tolerance_mm = TRAIL_TOLERANCE_PX / self.scale_factor
+        trails = [(BLUE if team == 0 else YELLOW, trail)
+                  for (team, _), trail in self.trails.robots.items()]
+        trails.append((ORANGE, self.trails.ball))
+
+        rects = []
+        for color, trail in trails:
+            points_mm = trail.simplified(tolerance_mm)
+            if len(points_mm) < 2:
+                continue
+            points_px = self.mm_to_px_array(points_mm)
+            if self.polyline_in_view(points_px, 1):
+                rects.append(pygame.draw.lines(self.screen, color, False, points_px, 1))
+        return rects
+
+    def draw_ball(self, pos_px=None):
         """Desenha a bola"""
-        params = MODALITY_PARAMS[self.game_mode]
-        ball_px_x, ball_px_y = self.mm_to_px(self.ball.x, self.ball.y)
-        ball_px_radius = params["ball_radius"] * self.scale_factor
-
-        pygame.draw.circle(self.screen, ORANGE,
-                           (ball_px_x, ball_px_y),
-                           ball_px_radius)
+        if pos_px is None:
+            pos_px = self.mm_to_px(self.ball.x, self.ball.y)
+        ball_px_radius = self.geometry.ball_radius * self.scale_factor
+
+        return pygame.draw.circle(self.screen, ORANGE, pos_px, ball_px_radius)
+
+    def draw_frame(self):
+        """Desenha um frame completo, convertendo todas as posições em lote"""
+        self.update_spatial_index()
+
+        profiler = self.profiler
+        started = profiler.start()
+        self.screen.fill(BLACK)
+        # Campo e elementos dinâmicos ficam recortados no painel do campo
+        self.screen.set_clip(self.field_rect)
+        self.draw_field()
+        profiler.stop('draw_field', started)
+
+        self.draw_dynamic()
+        self.screen.set_clip(None)
+
+        started = profiler.start()
+        self.draw_info_panel()
+        profiler.stop('draw_info_panel', started)
+
+    def draw_dynamic(self):
+        """Desenha caminhos, robôs e bola; retorna os retângulos afetados"""
+        rects = []
+
+        # Posições de todos os robôs convertidas direto dos arrays
+        world = self.render_world
+        n = world.count
+        positions_px = self.mm_to_px_array(world.xy[:n])
+        # Robôs fora da vista (com zoom) não são desenhados
+        geometry = self.geometry
+        visible = self.in_view(positions_px, geometry.robot_radius * self.scale_factor + 8)
+
+        profiler = self.profiler
+        if self.show_trails:
+            started = profiler.start()
+            rects.extend(self.draw_trails())
+            profiler.stop('draw_robot_path', started)
+
+        for robot_id, team, orientation, pos_px, is_visible in zip(
+                world.ids[:n].tolist(), world.team[:n].tolist(),
+                world.orientation[:n].tolist(), positions_px, visible.tolist()):
+            started = profiler.start()
+            path_rect = self.draw_robot_path(robot_id)
+            if path_rect is not None:
+                rects.append(path_rect)
+            profiler.stop('draw_robot_path', started)
+
+            if is_visible:
+                started = profiler.start()
+                rects.append(self.blit_robot(robot_id, TEAMS[team], orientation, pos_px))
+                profiler.stop('draw_robot', started)
+
+        if self.show_proximity:
+            started = profiler.start()
+            rects.extend(self.draw_proximity(positions_px))
+            profiler.stop('draw_robot', started)
+
+        started = profiler.start()
+        ball_px = self.mm_to_px_array(world.ball_xy)
+        if self.in_view(ball_px, geometry.ball_radius * self.scale_factor)[0]:
+            rects.append(self.draw_ball(ball_px))
+        profiler.stop('draw_ball', started)
+        return rects
+
+    def frame_state(self):
+        """Assinatura de tudo o que muda a imagem; igual entre frames = nada a redesenhar"""
+        world = self.render_world
+        n = world.count
+        return (self.game_mode, self.scale_factor, self._layer_pos, n, self._profile_version,
+                self._heatmap_version,
+                self.show_trails, self.show_proximity,
+                world.ids[:n].tobytes(), world.team[:n].tobytes(),
+                world.xy[:n].tobytes(), world.orientation[:n].tobytes(),
+                world.ball_xy.tobytes(),
+                tuple((robot_id, id(path), len(path))
+                      for robot_id, path in self.robot_paths.items()))
+
+    def build_background(self):
+        """Fundo da janela inteira: camada do campo + mapa de calor + fundo do painel"""
+        background = pygame.Surface((self.width, self.height))
+        pygame.draw.rect(background, GRAY,
+                         (self.field_panel_width, 0, self.info_panel_width, self.height))
+        self._background = background
+        self.update_field_background()
+
+    def field_background_key(self):
+        return (self.scale_factor, self._layer_pos, self._heatmap_version)
+
+    def update_field_background(self):
+        """Refaz o painel do campo do fundo; retorna False se ele já estava em dia"""
+        key = self.field_background_key()
+        if key == self._background_field:
+            return False
+        self.draw_field_background(self._background)
+        self._background_field = key
+        return True
+
+    def draw_field_items(self):
+        """Goleiras e elementos dinâmicos recortados no painel do campo, como no draw_frame"""
+        field_rect = self.field_rect
+        self.screen.set_clip(field_rect)
+        started = self.profiler.start()
+        goal_rects = self.draw_goals()
+        self.profiler.stop('draw_field', started)
+        rects = [rect.clip(field_rect) for rect in goal_rects + self.draw_dynamic()]
+        self.screen.set_clip(None)
+        return rects
+
+    def draw_frame_dirty(self):
+        """Desenha só o que mudou desde o último frame
+
+        Restaura o fundo nos retângulos ocupados no frame anterior, redesenha os
+        elementos dinâmicos e as linhas do painel que mudaram, e retorna os
+        retângulos a enviar com `pygame.display.update` ([] se nada mudou).
+        """
+        state = self.frame_state()
+        if self._background is not None and state == self._last_frame_state:
+            return []
+        self._last_frame_state = state
+        self.update_spatial_index()
+
+        profiler = self.profiler
+        if self._background is None:
+            # Primeiro frame ou geometria nova: desenha a janela inteira
+            started = profiler.start()
+            self.build_background()
+            self.screen.blit(self._background, (0, 0))
+            profiler.stop('draw_field', started)
+            self._dirty_rects = self.draw_field_items()
+
+            started = profiler.start()
+            self._panel_lines = self.info_panel_lines()
+            for surface, pos in self._panel_lines:
+                self.screen.blit(surface, pos)
+            profiler.stop('draw_info_panel', started)
+            return [self.screen.get_rect()]
+
+        # Elementos do campo: apaga os retângulos antigos e redesenha tudo por cima
+        started = profiler.start()
+        changed = self._dirty_rects
+        if self.update_field_background():
+            # Vista deslocada ou mapa de calor recolorido: o painel do campo inteiro
+            changed = [self.field_rect]
+        for rect in changed:
+            self.screen.blit(self._background, rect, rect)
+        profiler.stop('draw_field', started)
+        self._dirty_rects = self.draw_field_items()
+        changed = changed + self._dirty_rects
+
+        # Painel: só as linhas cuja superfície ou posição mudou
+        started = profiler.start()
+        lines = self.info_panel_lines()
+        previous = self._panel_lines
+        for i in range(max(len(lines), len(previous))):
+            old = previous[i] if i < len(previous) else None
+            new = lines[i] if i < len(lines) else None
+            if old is not None and new is not None and \
+                    old[0] is new[0] and old[1] == new[1]:
+                continue
+            for line in (old, new):
+                if line is not None:
+                    rect = line[0].get_rect(topleft=line[1])
+                    self.screen.blit(self._background, rect, rect)
+                    changed.append(rect)
+            if new is not None:
+                self.screen.blit(*new)
+        self._panel_lines = lines
+        profiler.stop('draw_info_panel', started)
+        return changed
 
     def draw_info_panel(self):
         """Desenha o painel de informações à direita"""
         # Fundo do painel
         pygame.draw.rect(self.screen, GRAY,
-                         (FIELD_PANEL_WIDTH, 0, INFO_PANEL_WIDTH, WINDOW_HEIGHT))
+                         (self.field_panel_width, 0, self.info_panel_width, self.height))
+
+        for surface, pos in self.info_panel_lines():
+            self.screen.blit(surface, pos)
+
+    def info_panel_lines(self):
+        """Linhas do painel como [(superfície, posição)], na ordem de desenho"""
+        lines = []
 
         # Título
-        title = self.big_font.render("Informações do Jogo", True, BLACK)
-        self.screen.blit(title, (FIELD_PANEL_WIDTH + 20, 20))
+        title = self.text_cache.render(self.big_font, "Informações do Jogo", BLACK)
+        lines.append((title, (self.field_panel_width + 20, 20)))
 
         # Modalidade atual
-        mode_text = self.font.render(
+        mode_text = self.text_cache.render(
+            self.font,
             f"Modalidade: {'SSL' if self.game_mode == GameMode.SSL else 'VSSS'}",
-            True, BLACK)
-        self.screen.blit(mode_text, (FIELD_PANEL_WIDTH + 20, 60))
+            BLACK)
+        lines.append((mode_text, (self.field_panel_width + 20, 60)))
 
         # Dimensões do campo
-        params = MODALITY_PARAMS[self.game_mode]
-        bounds = params["field_bounds"]
-        dim_text = self.font.render(
+        bounds = self.geometry.bounds
+        dim_text = self.text_cache.render(
+            self.font,
             f"Campo: X({bounds['x_min']},{bounds['x_max']}) Y({bounds['y_min']},{bounds['y_max']})",
-            True, BLACK)
-        self.screen.blit(dim_text, (FIELD_PANEL_WIDTH + 20, 90))
+            BLACK)
+        lines.append((dim_text, (self.field_panel_width + 20, 90)))
 
         # Info dos robôs
-        robot_title = self.font.render("Robôs:", True, BLACK)
-        self.screen.blit(robot_title, (FIELD_PANEL_WIDTH + 20, 130))
-
-        for i, robot in enumerate(self.robots):
-            robot_info = self.font.render(
-                f"ID {robot.id}: ({robot.x:.0f}, {robot.y:.0f}) mm, "
-                f"{math.degrees(robot.orientation):.1f}°",
-                True, BLUE if robot.team == 'blue' else YELLOW)
-            self.screen.blit(robot_info, (FIELD_PANEL_WIDTH + 20, 160 + i*30))
+        robot_title = self.text_cache.render(self.font, "Robôs:", BLACK)
+        lines.append((robot_title, (self.field_panel_width + 20, 130)))
+
+        world = self.render_world
+        n = world.count
+        for i, robot_row in enumerate(zip(
+                world.ids[:n].tolist(), world.team[:n].tolist(),
+                world.x[:n].tolist(), world.y[:n].tolist(),
+                world.orientation[:n].tolist())):
+            robot_info = self.robot_info_surface(*robot_row)
+            lines.append((robot_info, (self.field_panel_width + 20, 160 + i*30)))
 
         # Info da bola
-        ball_title = self.font.render("Bola:", True, BLACK)
-        self.screen.blit(ball_title, (FIELD_PANEL_WIDTH +
-                         20, 160 + len(self.robots)*30))
-
-        ball_info = self.font.render(
-            f"Posição: ({self.ball.x:.0f}, {self.ball.y:.0f}) mm",
-            True, ORANGE)
-        self.screen.blit(ball_info, (FIELD_PANEL_WIDTH +
-                         20, 190 + len(self.robots)*30))
+        ball_x, ball_y = world.ball_xy.tolist()
+        ball_title = self.text_cache.render(self.font, "Bola:", BLACK)
+        lines.append((ball_title, (self.field_panel_width + 20, 160 + n*30)))
+
+        ball_info = self.text_cache.render(
+            self.font,
+            f"Posição: ({ball_x:.0f}, {ball_y:.0f}) mm",
+            ORANGE)
+        lines.append((ball_info, (self.field_panel_width + 20, 190 + n*30)))
+
+        # Mapa de calor (tecla H)
+        y = 230 + n*30
+        if self.heatmap_channel is not None:
+            window = "jogo inteiro" if self.heatmap.window is None else \
+                f"últimos {self.heatmap.window:.0f} s"
+            lines.append((self.text_cache.render(
+                self.font, f"Mapa de calor: {self.heatmap_channel} ({window})", BLACK),
+                (self.field_panel_width + 20, y)))
+            y += 30
+
+        # Perfil de tempo por etapa (tecla P)
+        if self.show_profile:
+            lines.append((self.text_cache.render(
+                self.font, "Perfil (ms) p50 / p95 / p99:", BLACK),
+                (self.field_panel_width + 20, y)))
+            for i, (stage, values) in enumerate(self._profile_stats.items()):
+                text = self.text_cache.render(
+                    self.font,
+                    f"{stage}: {values[0]:.2f} / {values[1]:.2f} / {values[2]:.2f}",
+                    BLACK)
+                lines.append((text, (self.field_panel_width + 20, y + 20 + i*18)))
+        return lines
+
+    def refresh_profile_overlay(self, interval=0.5):
+        """Recalcula os percentis mostrados no painel no máximo a cada `interval` s"""
+        if not self.show_profile:
+            return
+        now = time.monotonic()
+        if now - self._profile_refreshed >= interval:
+            self._profile_refreshed = now
+            self._profile_stats = self.profiler.percentiles()
+            self._profile_version += 1
+
+    def refresh_heatmap_overlay(self, interval=0.5):
+        """Recolore o mapa de calor no máximo a cada `interval` s (e só se mudou)
+
+        O mapa faz parte do fundo: uma nova superfície muda `_heatmap_version`,
+        e o próximo frame incremental refaz só o painel do campo.
+        """
+        if self.heatmap_channel is None:
+            if self._heatmap_surface is not None:
+                self._heatmap_surface = None
+                self._heatmap_version += 1
+            return
+        now = time.monotonic()
+        state = (self.heatmap, self.heatmap_channel, self.heatmap.version)
+        if now - self._heatmap_refreshed >= interval and state != self._heatmap_rendered:
+            self._heatmap_refreshed = now
+            self._heatmap_rendered = state
+            self._heatmap_surface = self.heatmap.render(self.heatmap_channel,
+                                                        self._heatmap_colormap)
+            self._heatmap_version += 1
+
+    def robot_info_surface(self, robot_id, team, x, y, orientation):
+        """Linha do painel para um robô, refeita só quando os valores arredondados mudam"""
+        key = (round(x), round(y), round(math.degrees(orientation), 1))
+        cached = self._robot_info_lines.get((team, robot_id))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        surface = self.text_cache.render(
+            self.font,
+            f"ID {robot_id}: ({x:.0f}, {y:.0f}) mm, "
+            f"{math.degrees(orientation):.1f}°",
+            BLUE if team == 0 else YELLOW)
+        self._robot_info_lines[(team, robot_id)] = (key, surface)
+        return surface
+
+    def handle_key(self, key):
+        """Atalhos: 1/2 modalidade, C proximidade, T trajetórias, P perfil, 0 zoom, H mapa de calor"""
+        if key == pygame.K_1:
+            self.update_game_mode(GameMode.SSL)
+        elif key == pygame.K_2:
+            self.update_game_mode(GameMode.VSSS)
+        elif key == pygame.K_c:
+            self.show_proximity = not self.show_proximity
+        elif key == pygame.K_t:
+            self.show_trails = not self.show_trails
+        elif key == pygame.K_p:
+            self.show_profile = not self.show_profile
+            self._profile_version += 1
+        elif key == pygame.K_0:
+            self.reset_camera()
+        elif key == pygame.K_h:
+            channels = (None,) + HEATMAP_CHANNELS
+            self.heatmap_channel = channels[(channels.index(self.heatmap_channel) + 1)
+                                            % len(channels)]
+            self._heatmap_rendered = None
+            self._heatmap_refreshed = 0.0
+            self.refresh_heatmap_overlay()
+        elif self.replay is not None:
+            self.handle_replay_key(key)
+
+    def handle_mouse(self, event, pos):
+        """Roda do mouse aproxima/afasta sob o cursor; arrastar com o botão esquerdo desloca
+
+        `pos` é a posição do cursor em coordenadas desta superfície.
+        """
+        if not self.field_rect.collidepoint(pos):
+            return
+        if event.type == pygame.MOUSEWHEEL:
+            self.zoom_camera(event.y, pos)
+        elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+            self.pan_camera(*event.rel)
+
+    def update_sources(self, dt):
+        """Avança a fonte de dados ativa (replay, visão, ROS2, ingestão ou demonstração)"""
+        if self.replay is not None:
+            if self.replay.update(self.world, dt):
+                self.world_updated()
+        elif self.receiver is not None:
+            # Decodifica os pacotes pendentes direto no estado do mundo
+            t_capture = self.receiver.poll(self.world)
+            if t_capture is not None:
+                self.world_updated(t_capture)
+        elif self.bridge is not None:
+            # Um lote por frame com a última mensagem de cada robô
+            stamp = self.bridge.update(self.world, self.robot_paths)
+            if stamp is not None:
+                self.world_updated(stamp)
+        elif self.ingest is not None:
+            # Troca pelo snapshot mais recente, uma vez por frame
+            packet = self.ingest.latest()
+            if packet is not None:
+                self.apply_packet(packet)
+        else:
+            # Exemplo: mover robôs para demonstração
+            orientation = self.world.orientation[:self.world.count]
+            orientation += 0.02
+            orientation[orientation > 2*math.pi] -= 2*math.pi
+            self.world_updated()
+        self.update_estimate()
+        self.trails.record(self.world, time.monotonic())
+
+    def close_sources(self):
+        """Exporta o perfil e fecha as fontes e a gravação"""
+        if self.profile_path is not None:
+            self.profiler.export(self.profile_path)
+        if self.ingest is not None:
+            self.ingest.stop()
+        if self.receiver is not None:
+            self.receiver.close()
+        if self.bridge is not None:
+            self.bridge.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
     def run(self):
-        """Loop principal do visualizador"""
+        """Loop principal do visualizador
+
+        Sem janela (headless) não há tela para atualizar nem limite de FPS: cada
+        frame é desenhado na superfície fora da tela o mais rápido possível.
+        """
         self.calculate_scale_factor()
         clock = pygame.time.Clock()
+        dt = 0.0
+        last_frame = time.perf_counter()
 
+        profiler = self.profiler
         running = True
         while running:
+            started = profiler.start()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_1:
-                        self.update_game_mode(GameMode.SSL)
-                    elif event.key == pygame.K_2:
-                        self.update_game_mode(GameMode.VSSS)
-
-            # Atualizações (aqui você integraria com ROS2)
-            # Exemplo: mover robôs para demonstração
-            for robot in self.robots:
-                robot.orientation += 0.02
-                if robot.orientation > 2*math.pi:
-                    robot.orientation -= 2*math.pi
-
-            # Desenha tudo
-            self.screen.fill(BLACK)
-            self.draw_field()
-
-            for robot in self.robots:
-                self.draw_robot_path(robot.id)
-                self.draw_robot(robot)
-
-            self.draw_ball()
-            self.draw_info_panel()
-
-            pygame.display.flip()
-            clock.tick(60)
+                    self.handle_key(event.key)
+                elif event.type in (pygame.MOUSEWHEEL, pygame.MOUSEMOTION):
+                    self.handle_mouse(event, pygame.mouse.get_pos())
+                elif event.type == pygame.VIDEORESIZE:
+                    self.resize(pygame.display.set_mode(event.size, pygame.RESIZABLE))
+            profiler.stop('events', started)
+
+            # Atualizações das fontes (ROS2, visão, replay ou demonstração)
+            started = profiler.start()
+            self.update_sources(dt)
+            self.refresh_profile_overlay()
+            self.refresh_heatmap_overlay()
+            profiler.stop('update', started)
+
+            # Desenha só o que mudou e envia apenas essas regiões
+            dirty_rects = self.draw_frame_dirty()
+            started = profiler.start()
+            if dirty_rects and not self.headless:
+                pygame.display.update(dirty_rects)
+            profiler.stop('flip', started)
+            if not profiler.frames:
+                # Partida a frio: da criação do visualizador até o primeiro frame na tela
+                profiler.startup['first_frame'] = time.perf_counter() - self._created
+
+            profiler.end_frame()
+            if self.headless:
+                now = time.perf_counter()
+                dt, last_frame = now - last_frame, now
+            else:
+                dt = clock.tick(60) / 1000
 
+        self.close_sources()
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Visualizador de futebol de robôs")
+    parser.add_argument("--record", metavar="LOG",
+                        help="grava os snapshots recebidos num log binário")
+    parser.add_argument("--replay", metavar="LOG",
+                        help="reproduz um log gravado com --record")
+    parser.add_argument("--interpolate", metavar="ATRASO", type=float, nargs="?", const=0.0,
+                        help="desenha poses interpoladas com o atraso dado (s); "
+                             "sem valor, só extrapola a partir da última amostra")
+    parser.add_argument("--profile-out", metavar="ARQUIVO",
+                        help="exporta os percentis de tempo por etapa ao sair (.csv ou .json)")
+    parser.add_argument("--vision", metavar="GRUPO:PORTA", nargs="?", const="",
+                        help="recebe detecções da visão (SSL-Vision/VSSS) por UDP multicast; "
+                             "sem valor, usa o endereço padrão da SSL-Vision")
+    parser.add_argument("--ros2", action="store_true",
+                        help="assina poses, bola e caminhos planejados via ROS2 (rclpy)")
+    parser.add_argument("--ros-depth", type=int, default=64,
+                        help="máximo de robôs pendentes por fila da ponte ROS2")
+    parser.add_argument("--ros-drop", choices=("oldest", "newest"), default="oldest",
+                        help="o que descartar quando a fila da ponte ROS2 enche")
+    args = parser.parse_args()
+
     visualizer = SoccerVisualizer()
+    visualizer.profile_path = args.profile_out
+    if args.interpolate is not None:
+        visualizer.enable_interpolation(delay=args.interpolate)
+    if args.replay:
+        from gravacao import LogReplay
+        visualizer.attach_replay(LogReplay(args.replay))
+    elif args.vision is not None:
+        from visao_udp import SSL_VISION_ADDRESS, VisionReceiver
+        address = SSL_VISION_ADDRESS
+        if args.vision:
+            group, port = args.vision.rsplit(':', 1)
+            address = (group, int(port))
+        visualizer.attach_receiver(VisionReceiver(address))
+    elif args.ros2:
+        from ponte_ros import Ros2Transport, RosBridge
+        visualizer.attach_bridge(RosBridge(Ros2Transport(depth=args.ros_depth),
+                                           depth=args.ros_depth, policy=args.ros_drop))
+    if args.record:
+        from gravacao import LogRecorder
+        visualizer.attach_recorder(LogRecorder(args.record))
     visualizer.run()